@@ -0,0 +1,108 @@
+"""Remplaçant de l'API d'envoi de Discord pour les tests de charge
+
+FakeBot et FakeChannel exposent juste ce que le pipeline utilise
+(bot.get_channel, channel.send). Les envois sont soumis aux limites de débit
+de Discord (par canal et globale), avec une latence simulée; un dépassement
+lève une HTTPException 429 comme le ferait discord.py. Chaque article reçu
+est horodaté pour mesurer la latence de bout en bout.
+"""
+import time
+import random
+import asyncio
+import discord
+
+# Limites de Discord
+CHANNEL_RATE = 5  # Messages par canal...
+CHANNEL_PERIOD = 5  # ...par période de 5 secondes
+GLOBAL_RATE = 50  # Requêtes par seconde pour tout le bot
+
+class _Response:
+    """Réponse HTTP minimale attendue par discord.HTTPException"""
+    __slots__ = ("status", "reason")
+
+    def __init__(self, status, reason):
+        self.status = status
+        self.reason = reason
+
+class _Window:
+    """Fenêtre glissante des requêtes acceptées (limite stricte, comme côté serveur)"""
+    __slots__ = ("rate", "period", "requests")
+
+    def __init__(self, rate, period):
+        self.rate = rate
+        self.period = period
+        self.requests = []
+
+    def retry_after(self, now):
+        """Délai avant la prochaine requête acceptée (0 si elle l'est immédiatement)"""
+        self.requests = [sent for sent in self.requests if now - sent < self.period]
+        if len(self.requests) < self.rate:
+            return 0
+        return self.period - (now - self.requests[0])
+
+class DiscordSink:
+    """Compte les appels à l'API et enregistre l'heure de réception des articles"""
+
+    def __init__(self, latency=0.05, error_rate=0.0, rate_limit_rate=0.0, seed=42):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = random.Random(seed)
+        self._global = _Window(GLOBAL_RATE, 1)
+        self._channels = {}
+        self.calls = 0
+        self.messages = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.received = {}  # {(canal, lien de l'article): instant de réception}
+        self.duplicates = 0
+
+    async def send(self, channel_id, embeds):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self._rng.uniform(0, 2 * self.latency))
+
+        now = time.time()
+        window = self._channels.setdefault(channel_id, _Window(CHANNEL_RATE, CHANNEL_PERIOD))
+        retry_after = max(window.retry_after(now), self._global.retry_after(now))
+        if retry_after or self._rng.random() < self.rate_limit_rate:
+            self.rate_limited += 1
+            raise discord.HTTPException(_Response(429, "Too Many Requests"),
+                                        {"message": "You are being rate limited.", "retry_after": retry_after})
+        if self._rng.random() < self.error_rate:
+            self.errors += 1
+            raise discord.HTTPException(_Response(502, "Bad Gateway"), "Bad Gateway")
+
+        window.requests.append(now)
+        self._global.requests.append(now)
+        self.messages += 1
+        for embed in embeds:
+            key = (channel_id, embed.url)
+            if key in self.received:
+                self.duplicates += 1
+            else:
+                self.received[key] = now
+
+class FakeChannel:
+    """Canal textuel minimal: seul l'envoi de messages est simulé"""
+
+    def __init__(self, sink, channel_id):
+        self.sink = sink
+        self.id = channel_id
+
+    async def send(self, content=None, embed=None, embeds=None):
+        await self.sink.send(self.id, embeds or ([embed] if embed else []))
+
+class FakeBot:
+    """Bot minimal: fournit les canaux simulés aux vérifications de flux"""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self._channels = {}
+
+    def add_channel(self, channel_id):
+        self._channels[channel_id] = FakeChannel(self.sink, channel_id)
+        return self._channels[channel_id]
+
+    def get_channel(self, channel_id):
+        return self._channels.get(channel_id)
@@ -0,0 +1,147 @@
+"""Serveur HTTP local de flux RSS synthétiques pour les tests de charge
+
+Chaque flux publie des articles à intervalle régulier (tiré au hasard autour
+d'une moyenne) et sert ses FEED_ITEMS derniers articles. Le serveur simule
+une latence de réponse, des erreurs passagères et des flux morts, et répond
+304 aux requêtes conditionnelles (If-None-Match) quand rien n'a changé.
+
+Le serveur écoute sur plusieurs adresses de boucle locale (127.0.0.1,
+127.0.0.2...) pour que les flux soient répartis sur plusieurs hôtes, comme en
+production: le bot limite le nombre de requêtes simultanées par hôte.
+"""
+import math
+import time
+import random
+import asyncio
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+from aiohttp import web
+
+from benchmarks.make_corpus import SENTENCES
+
+# Nombre d'articles servis par flux
+FEED_ITEMS = 20
+
+# Intervalle minimal (secondes) entre deux articles d'un même flux
+MIN_PUBLISH_INTERVAL = 5
+
+_WORDS = sorted({word.strip(".,'").lower() for sentences in SENTENCES.values()
+                 for sentence in sentences for word in sentence.split() if len(word) > 3})
+
+class SyntheticFeeds:
+    """Flux synthétiques dont les dates de publication se déduisent de leur numéro
+
+    L'article `index` du flux `number` est publié à
+    started + phase + (index - FEED_ITEMS) * interval, ce qui permet de
+    retrouver sa date de publication à partir de son lien sans rien mémoriser.
+    """
+
+    def __init__(self, count, update_interval, latency=0.0, failure_rate=0.0, dead_rate=0.0, seed=42):
+        rng = random.Random(seed)
+        self.count = count
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.started = time.time()
+        self._intervals = [max(MIN_PUBLISH_INTERVAL, rng.expovariate(1 / update_interval)) for _ in range(count)]
+        self._phases = [rng.uniform(0, interval) for interval in self._intervals]
+        self._dead = {number for number in range(count) if rng.random() < dead_rate}
+        self._rng = rng
+        self.responses = {}  # {statut HTTP: nombre de réponses}
+        self.bytes_sent = 0
+
+    def published_count(self, number, now=None):
+        """Nombre d'articles publiés par un flux (les FEED_ITEMS premiers existent dès le départ)"""
+        now = time.time() if now is None else now
+        elapsed = now - self.started - self._phases[number]
+        return FEED_ITEMS + max(0, math.floor(elapsed / self._intervals[number]) + 1)
+
+    def published_at(self, number, index):
+        """Date de publication (secondes UTC) de l'article `index` d'un flux"""
+        return self.started + self._phases[number] + (index - FEED_ITEMS) * self._intervals[number]
+
+    def published_between(self, start, end):
+        """Nombre total d'articles publiés entre deux instants"""
+        return sum(self.published_count(number, end) - self.published_count(number, start) for number in range(self.count))
+
+    def is_dead(self, number):
+        """Indique si un flux répond toujours en erreur"""
+        return number in self._dead
+
+    @staticmethod
+    def parse_link(link):
+        """Retourne (numéro du flux, numéro de l'article) à partir du lien d'un article"""
+        *_, number, index = link.rstrip("/").split("/")
+        return int(number), int(index)
+
+    @staticmethod
+    def feed_number(url):
+        """Retourne le numéro d'un flux à partir de son URL"""
+        return int(url.rstrip("/").rsplit("/", 1)[1])
+
+    def _item(self, base_url, number, index):
+        rng = random.Random(number * 1_000_003 + index)
+        title = " ".join(rng.choice(_WORDS) for _ in range(10)).capitalize()
+        description = " ".join(rng.choice(_WORDS) for _ in range(40))
+        link = f"{base_url}/article/{number}/{index}"
+        published = formatdate(self.published_at(number, index), usegmt=True)
+        return (f"<item><title>{escape(title)}</title><link>{link}</link><guid>{link}</guid>"
+                f"<pubDate>{published}</pubDate><description>{escape(description)}</description></item>")
+
+    def render(self, base_url, number, count):
+        """Document RSS des FEED_ITEMS derniers articles d'un flux"""
+        items = "".join(self._item(base_url, number, index) for index in range(count - 1, count - 1 - FEED_ITEMS, -1))
+        return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>Flux synthétique {number}</title><link>{base_url}/</link>"
+                f"<description>Flux de test de charge</description>{items}</channel></rss>")
+
+    async def handle_feed(self, request):
+        number = int(request.match_info["number"])
+        if number >= self.count:
+            raise web.HTTPNotFound()
+        if self.latency:
+            await asyncio.sleep(self._rng.uniform(0, 2 * self.latency))
+
+        if number in self._dead or self._rng.random() < self.failure_rate:
+            self.responses[503] = self.responses.get(503, 0) + 1
+            return web.Response(status=503, text="Service indisponible")
+
+        count = self.published_count(number)
+        etag = f'"{number}-{count}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.responses[304] = self.responses.get(304, 0) + 1
+            return web.Response(status=304, headers={"ETag": etag})
+
+        body = self.render(f"http://{request.host}", number, count).encode()
+        self.responses[200] = self.responses.get(200, 0) + 1
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type="application/rss+xml", headers={"ETag": etag})
+
+class FeedServer:
+    """Serveur aiohttp des flux synthétiques, sur `hosts` adresses de boucle locale"""
+
+    def __init__(self, feeds, hosts=1, port=0):
+        self.feeds = feeds
+        self.hosts = hosts
+        self.port = port
+        self._runner = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/feed/{number}", self.feeds.handle_feed)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        for host in range(self.hosts):
+            site = web.TCPSite(self._runner, f"127.0.0.{host + 1}", self.port)
+            await site.start()
+            if not self.port:
+                # Réutiliser le port attribué par le système pour les autres adresses
+                self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+        self._runner = None
+
+    def url(self, number):
+        """URL du flux `number`, réparti sur les hôtes"""
+        return f"http://127.0.0.{number % self.hosts + 1}:{self.port}/feed/{number}"
@@ -0,0 +1,255 @@
+"""Test de charge de bout en bout du pipeline de vérification des flux
+
+Le vrai pipeline (ordonnanceur, check_feed, téléchargement, parsing,
+déduplication, file d'envoi) tourne contre un serveur local de flux
+synthétiques (benchmarks/feed_server.py) et un faux Discord qui applique ses
+limites de débit (benchmarks/discord_sink.py). La configuration est écrite
+dans un dossier temporaire: data/ n'est pas modifié.
+
+Le rapport donne le temps du premier balayage de tous les flux, l'intervalle
+effectif entre deux vérifications d'un flux, le retard de l'ordonnanceur, la
+latence de bout en bout des articles (publication -> réception par Discord),
+la mémoire et le nombre d'appels aux API.
+
+Utilisation (depuis la racine du dépôt):
+    python -m benchmarks.loadtest                                  # 500 serveurs, 2 000 flux, 2 minutes
+    python -m benchmarks.loadtest --guilds 5000 --feeds 20000 --duration 600 -o loadtest.json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import POLL_MIN_INTERVAL, POLL_DEFAULT_INTERVAL
+from utils import storage, scheduler
+from utils.storage import rss_configs, flush_config
+from utils.fetcher import close_session, shutdown_parse_pool
+from utils.delivery import delivery_queue
+from utils.scheduler import feed_scheduler
+from cogs.rss_commands import check_feed
+from benchmarks.feed_server import SyntheticFeeds, FeedServer
+from benchmarks.discord_sink import DiscordSink, FakeBot
+from benchmarks.run import git_revision
+
+# Identifiant du canal du premier serveur simulé
+FIRST_CHANNEL_ID = 10_000
+
+def percentiles(values, *points):
+    """Percentiles (0-100) d'une liste de valeurs, None si elle est vide"""
+    if not values:
+        return {f"p{point}": None for point in points}
+    values = sorted(values)
+    return {f"p{point}": round(values[min(len(values) - 1, int(len(values) * point / 100))], 3) for point in points}
+
+def current_rss():
+    """Mémoire résidente actuelle du processus en octets (None hors Linux)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+def peak_rss():
+    """Pic de mémoire résidente du processus en octets (None si indisponible)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def subscribe(server, guilds, feeds_per_guild, batch):
+    """Abonne les serveurs simulés aux flux, répartis en tourniquet (les flux sont partagés au-delà de --feeds)"""
+    rss_configs.clear()
+    for guild in range(guilds):
+        numbers = {(guild * feeds_per_guild + offset) % server.feeds.count for offset in range(feeds_per_guild)}
+        rss_configs[str(guild)] = {
+            "channel": FIRST_CHANNEL_ID + guild,
+            "feeds": {server.url(number): None for number in sorted(numbers)},
+            "batch_embeds": batch,
+        }
+
+class LoadTest:
+    """Fait tourner le pipeline pendant une durée donnée et collecte les mesures"""
+
+    def __init__(self, args):
+        self.args = args
+        self.feeds = SyntheticFeeds(args.feeds, args.update_interval, args.feed_latency,
+                                    args.feed_failure_rate, args.dead_feeds, args.seed)
+        self.server = FeedServer(self.feeds, args.hosts)
+        self.sink = DiscordSink(args.discord_latency, args.discord_error_rate, args.discord_429_rate, args.seed)
+        self.bot = FakeBot(self.sink)
+        self.checks = {}  # {url: [fin de chaque vérification]}
+        self.check_durations = []
+        self.samples = []  # [(instant, retard, flux en attente, embeds en attente)]
+
+    async def _check(self, url, guild_ids):
+        """Gestionnaire de l'ordonnanceur: check_feed réel, chronométré"""
+        started = time.perf_counter()
+        try:
+            await check_feed(self.bot, url, guild_ids)
+        finally:
+            self.check_durations.append(time.perf_counter() - started)
+            self.checks.setdefault(url, []).append(time.time())
+
+    async def _sample(self):
+        while True:
+            self.samples.append((time.time(), feed_scheduler.lag, feed_scheduler.depth, delivery_queue.depth))
+            await asyncio.sleep(1)
+
+    async def run(self):
+        args = self.args
+        await self.server.start()
+        subscribe(self.server, args.guilds, args.feeds_per_guild, args.batch)
+        for config in rss_configs.values():
+            self.bot.add_channel(config["channel"])
+
+        started = time.time()
+        delivery_queue.start()
+        feed_scheduler.start(self._check)
+        sampler = asyncio.create_task(self._sample())
+        try:
+            await asyncio.sleep(args.duration)
+        finally:
+            stopped = time.time()
+            await feed_scheduler.stop()
+            await delivery_queue.stop(timeout=args.drain)
+            sampler.cancel()
+            await flush_config()
+            await close_session()
+            shutdown_parse_pool()
+            await self.server.stop()
+        return self.report(started, stopped)
+
+    def report(self, started, stopped):
+        first_sweep = None
+        if len(self.checks) == len(self.feeds_subscribed()):
+            first_sweep = max(checks[0] for checks in self.checks.values()) - started
+        intervals = [later - earlier for checks in self.checks.values() for earlier, later in zip(checks, checks[1:])]
+
+        # Articles attendus: une fois par abonnement, s'ils ont été publiés entre
+        # la première et la dernière vérification de leur flux (hors flux morts)
+        expected = 0
+        for config in rss_configs.values():
+            for url in config["feeds"]:
+                number = SyntheticFeeds.feed_number(url)
+                if url in self.checks and not self.feeds.is_dead(number):
+                    checks = self.checks[url]
+                    expected += self.feeds.published_count(number, checks[-1]) - self.feeds.published_count(number, checks[0])
+
+        latencies = []
+        for (channel_id, link), received in self.sink.received.items():
+            number, index = SyntheticFeeds.parse_link(link)
+            latencies.append(received - self.feeds.published_at(number, index))
+
+        return {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": vars(self.args),
+            "duration": round(stopped - started, 1),
+            "subscriptions": sum(len(config["feeds"]) for config in rss_configs.values()),
+            "feeds_checked": len(self.checks),
+            "checks": sum(len(checks) for checks in self.checks.values()),
+            "first_sweep_seconds": round(first_sweep, 1) if first_sweep is not None else None,
+            "check_interval_seconds": percentiles(intervals, 50, 95),
+            "check_duration_seconds": percentiles(self.check_durations, 50, 95, 99),
+            "scheduler_lag_seconds": percentiles([sample[1] for sample in self.samples], 50, 95, 100),
+            "scheduler_max_depth": max((sample[2] for sample in self.samples), default=0),
+            "delivery_max_depth": max((sample[3] for sample in self.samples), default=0),
+            "delivery_undelivered": delivery_queue.depth,
+            "articles_published": self.feeds.published_between(started, stopped),
+            "articles_expected": expected,
+            "articles_delivered": len(self.sink.received),
+            "articles_duplicated": self.sink.duplicates,
+            "article_latency_seconds": percentiles(latencies, 50, 95, 99, 100),
+            "feed_requests": dict(sorted(self.feeds.responses.items())),
+            "feed_bytes": self.feeds.bytes_sent,
+            "discord_calls": self.sink.calls,
+            "discord_messages": self.sink.messages,
+            "discord_rate_limited": self.sink.rate_limited,
+            "discord_errors": self.sink.errors,
+            "memory_peak_bytes": peak_rss(),
+            "memory_final_bytes": current_rss(),
+        }
+
+    def feeds_subscribed(self):
+        return {url for config in rss_configs.values() for url in config["feeds"]}
+
+def print_report(report):
+    def fmt(values):
+        if all(value is None for value in values.values()):
+            return "aucune mesure"
+        return ", ".join(f"{name} {value}s" for name, value in values.items())
+
+    def mib(value):
+        return f"{value / 2 ** 20:.0f} Mio" if value is not None else "indisponible"
+
+    requests = report["feed_requests"]
+    print(f"Durée: {report['duration']}s, {report['subscriptions']} abonnements, "
+          f"{report['feeds_checked']} flux vérifiés ({report['checks']} vérifications)")
+    print(f"Premier balayage de tous les flux: {report['first_sweep_seconds'] or 'incomplet'}"
+          f"{'s' if report['first_sweep_seconds'] else ''}")
+    print(f"Intervalle entre deux vérifications d'un flux: {fmt(report['check_interval_seconds'])}")
+    print(f"Durée d'une vérification: {fmt(report['check_duration_seconds'])}")
+    print(f"Retard de l'ordonnanceur: {fmt(report['scheduler_lag_seconds'])}, "
+          f"jusqu'à {report['scheduler_max_depth']} flux en attente")
+    print(f"Articles: {report['articles_published']} publiés pendant le test, {report['articles_expected']} à livrer "
+          f"(par abonnement, entre la première et la dernière vérification du flux), {report['articles_delivered']} livrés "
+          f"({report['articles_duplicated']} en double, {report['delivery_undelivered']} non envoyés à l'arrêt)")
+    print(f"Latence des articles (publication -> Discord): {fmt(report['article_latency_seconds'])}")
+    print(f"Requêtes de flux: {sum(requests.values())} "
+          f"({', '.join(f'{status}: {count}' for status, count in requests.items())}), "
+          f"{report['feed_bytes'] / 2 ** 20:.1f} Mio servis")
+    print(f"Appels à Discord: {report['discord_calls']} ({report['discord_messages']} messages, "
+          f"{report['discord_rate_limited']} 429, {report['discord_errors']} erreurs), "
+          f"file d'envoi jusqu'à {report['delivery_max_depth']} embeds")
+    print(f"Mémoire: pic {mib(report['memory_peak_bytes'])}, fin {mib(report['memory_final_bytes'])} "
+          f"(serveur de flux inclus)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du bot RSS contre des flux et un Discord simulés")
+    parser.add_argument("--guilds", type=int, default=500, help="Nombre de serveurs Discord simulés")
+    parser.add_argument("--feeds", type=int, default=2000, help="Nombre de flux synthétiques")
+    parser.add_argument("--feeds-per-guild", type=int, default=5, help="Flux suivis par serveur")
+    parser.add_argument("--duration", type=float, default=120, help="Durée du test (secondes)")
+    parser.add_argument("--drain", type=float, default=30, help="Temps laissé à la file d'envoi pour se vider à la fin (secondes)")
+    parser.add_argument("--update-interval", type=float, default=120, help="Intervalle moyen entre deux articles d'un flux (secondes)")
+    parser.add_argument("--min-interval", type=float, default=10, help="Intervalle minimal entre deux vérifications d'un flux (remplace POLL_MIN_INTERVAL)")
+    parser.add_argument("--hosts", type=int, default=50, help="Nombre d'hôtes (adresses 127.0.0.x) sur lesquels répartir les flux")
+    parser.add_argument("--feed-latency", type=float, default=0.05, help="Latence moyenne du serveur de flux (secondes)")
+    parser.add_argument("--feed-failure-rate", type=float, default=0.01, help="Proportion de réponses 503 passagères")
+    parser.add_argument("--dead-feeds", type=float, default=0.01, help="Proportion de flux toujours en erreur")
+    parser.add_argument("--discord-latency", type=float, default=0.05, help="Latence moyenne de l'API Discord (secondes)")
+    parser.add_argument("--discord-error-rate", type=float, default=0.0, help="Proportion d'erreurs 502 de Discord")
+    parser.add_argument("--discord-429-rate", type=float, default=0.0, help="Proportion de 429 aléatoires (en plus des limites de débit)")
+    parser.add_argument("--batch", action="store_true", help="Regrouper les articles par message (batchrss)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--log-level", default="CRITICAL", help="Niveau des logs du bot pendant le test")
+    parser.add_argument("-o", "--output", help="Fichier JSON où enregistrer le rapport")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Configuration dans un dossier temporaire et planification accélérée
+    tmp_dir = tempfile.mkdtemp(prefix="rss_loadtest_")
+    storage.STORAGE_BACKEND = "json"
+    storage.CONFIG_FILE = os.path.join(tmp_dir, "config.json")
+    scheduler.POLL_MIN_INTERVAL = args.min_interval
+    scheduler.POLL_DEFAULT_INTERVAL = POLL_DEFAULT_INTERVAL * args.min_interval / POLL_MIN_INTERVAL
+
+    report = asyncio.run(LoadTest(args).run())
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nRapport enregistré dans {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Génère le corpus de flux RSS/Atom utilisé par les benchmarks
+
+Le corpus est versionné dans benchmarks/corpus: ce script ne sert qu'à le
+régénérer (de façon déterministe) si sa composition doit changer.
+
+Utilisation: python -m benchmarks.make_corpus
+"""
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+SENTENCES = {
+    "fr": [
+        "Les chercheurs ont présenté un nouvel outil d'intelligence artificielle pour la détection précoce du cancer.",
+        "Le ministère de la Santé annonce un plan de dépistage renforcé dans les hôpitaux publics.",
+        "Selon l'étude, l'imagerie médicale assistée par IA réduit de 30 % le temps de diagnostic.",
+        "Les startups françaises de la santé numérique ont levé plus de deux milliards d'euros cette année.",
+        "La radiologie est l'une des spécialités les plus transformées par l'apprentissage automatique.",
+        "Les médecins restent prudents quant à l'utilisation de ces algorithmes en routine clinique.",
+        "Le gouvernement prévoit un cadre réglementaire pour les dispositifs médicaux intelligents.",
+        "Une équipe de l'Inserm publie des résultats prometteurs sur l'analyse des IRM cérébrales.",
+    ],
+    "en": [
+        "Researchers unveiled a new AI tool for early cancer detection in clinical settings.",
+        "The hospital network reported faster radiology turnaround after deploying machine learning.",
+        "Medical AI startups raised record funding in the last quarter, according to analysts.",
+        "Regulators are drafting new guidance for AI-powered medical devices and diagnostics.",
+        "The study found that deep learning models matched specialists on MRI interpretation.",
+        "Doctors warn that algorithmic bias remains a concern for healthcare deployments.",
+        "A new dataset of chest X-rays was released to accelerate open research.",
+        "Technology companies are partnering with clinics to pilot digital health assistants.",
+    ],
+}
+
+def paragraph(rng, lang, count):
+    return " ".join(rng.choice(SENTENCES[lang]) for _ in range(count))
+
+def html_body(rng, lang):
+    """Résumé riche en HTML: paragraphes, liens, listes, images, entités et script"""
+    parts = [f"<p>{escape(paragraph(rng, lang, 3))}</p>"]
+    parts.append(f'<p><img src="https://cdn.example.com/img/{rng.randint(1, 9999)}.jpg" alt="illustration"/>'
+                 f'<a href="https://example.com/article/{rng.randint(1, 9999)}?utm_source=rss">Lire la suite &raquo;</a></p>')
+    parts.append("<ul>" + "".join(f"<li><strong>{escape(rng.choice(SENTENCES[lang]))}</strong></li>" for _ in range(4)) + "</ul>")
+    parts.append("<script>window.tracker && window.tracker.push({event: 'view'});</script>")
+    parts.append(f"<blockquote>&laquo;&nbsp;{escape(paragraph(rng, lang, 2))}&nbsp;&raquo;</blockquote>")
+    parts.append("<style>.promo{display:none}</style><div class=\"promo\"><em>Publicité</em></div>")
+    return "".join(parts)
+
+def rss_document(rng, title, lang, items, html=False, media=True):
+    now = datetime(2025, 1, 15, 12, 0, tzinfo=timezone.utc)
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/" '
+             'xmlns:content="http://purl.org/rss/1.0/modules/content/" '
+             'xmlns:sy="http://purl.org/rss/1.0/modules/syndication/">',
+             "<channel>",
+             f"<title>{escape(title)}</title>",
+             "<link>https://example.com/</link>",
+             f"<language>{lang}</language>",
+             "<ttl>30</ttl>",
+             "<sy:updatePeriod>hourly</sy:updatePeriod>",
+             "<image><url>https://example.com/logo.png</url><title>Logo</title><link>https://example.com/</link></image>"]
+    for i in range(items):
+        published = now - timedelta(minutes=37 * i)
+        body = html_body(rng, lang) if html else escape(paragraph(rng, lang, 2))
+        lines.append("<item>")
+        lines.append(f"<title>{escape(rng.choice(SENTENCES[lang])[:90])}</title>")
+        lines.append(f"<link>https://example.com/{lang}/article-{i}?utm_medium=rss&amp;id={i}</link>")
+        lines.append(f'<guid isPermaLink="false">{lang}-{title}-{i}</guid>')
+        lines.append(f"<pubDate>{format_datetime(published)}</pubDate>")
+        lines.append(f"<author>redaction@example.com (Rédaction {i % 7})</author>")
+        for category in rng.sample(["Santé", "IA", "Recherche", "Tech", "Health", "Science", "Radiology"], 3):
+            lines.append(f"<category>{escape(category)}</category>")
+        if media:
+            lines.append(f'<media:content url="https://cdn.example.com/{lang}/{i}.jpg" medium="image"/>')
+        lines.append(f"<description>{escape(body)}</description>")
+        if html:
+            lines.append(f"<content:encoded><![CDATA[{html_body(rng, lang)}]]></content:encoded>")
+        lines.append("</item>")
+    lines += ["</channel>", "</rss>"]
+    return "\n".join(lines)
+
+def atom_document(rng, title, lang, items):
+    now = datetime(2025, 1, 15, 12, 0, tzinfo=timezone.utc)
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<feed xmlns="http://www.w3.org/2005/Atom">',
+             f"<title>{escape(title)}</title>",
+             '<link href="https://example.org/"/>',
+             f"<updated>{now.isoformat()}</updated>",
+             "<id>urn:uuid:60a76c80-d399-11d9-b93c-0003939e0af6</id>"]
+    for i in range(items):
+        updated = (now - timedelta(hours=3 * i)).isoformat()
+        lines.append("<entry>")
+        lines.append(f"<title>{escape(rng.choice(SENTENCES[lang]))}</title>")
+        lines.append(f'<link rel="alternate" href="https://example.org/{lang}/{i}"/>')
+        lines.append(f"<id>urn:example:{lang}:{i}</id>")
+        lines.append(f"<updated>{updated}</updated>")
+        lines.append(f"<published>{updated}</published>")
+        lines.append(f"<author><name>Auteur {i % 5}</name></author>")
+        lines.append(f'<category term="{rng.choice(["IA", "Health", "Tech"])}"/>')
+        lines.append(f'<summary type="html">{escape(html_body(rng, lang))}</summary>')
+        lines.append("</entry>")
+    lines.append("</feed>")
+    return "\n".join(lines)
+
+def main():
+    rng = random.Random(42)
+    documents = {
+        "small_en.xml": rss_document(rng, "Small English feed", "en", 5),
+        "small_fr.xml": rss_document(rng, "Petit flux français", "fr", 5),
+        "html_heavy_fr.xml": rss_document(rng, "Flux HTML chargé", "fr", 40, html=True),
+        "atom_en.xml": atom_document(rng, "Atom English feed", "en", 30),
+        "huge_fr.xml": rss_document(rng, "Très gros flux", "fr", 200, html=True),
+    }
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    for name, document in documents.items():
+        with open(os.path.join(CORPUS_DIR, name), "w", encoding="utf-8") as f:
+            f.write(document)
+        print(f"{name}: {len(document.encode()) // 1024} Ko")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Micro-benchmarks du chemin critique (parsing, nettoyage HTML, filtrage, embeds)
+
+Chaque benchmark traite un lot d'éléments tirés du corpus versionné
+(benchmarks/corpus) et mesure le débit (opérations par seconde, meilleur de
+plusieurs essais) et la mémoire allouée au pic (tracemalloc) par opération,
+en moyenne et au maximum sur les éléments du lot.
+
+Utilisation (depuis la racine du dépôt):
+    python -m benchmarks.run                          # affiche les résultats
+    python -m benchmarks.run -o baseline.json         # enregistre une référence
+    python -m benchmarks.run --compare baseline.json  # compare à une référence
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import feedparser
+from config import DEFAULT_KEYWORDS
+from utils import rss_parser
+from utils.rss_parser import (parse_feed_content, build_feed, clean_html, contains_keywords,
+                              find_keywords, parse_date, get_entry_image)
+from utils.keyword_matcher import KeywordMatcher
+from utils.embed_builder import create_article_embed
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+# Durée minimale d'un essai et nombre d'essais (le meilleur est retenu)
+MIN_TRIAL_TIME = 0.2
+TRIALS = 5
+
+# Écart (en %) au-delà duquel une comparaison est signalée
+REGRESSION_THRESHOLD = 10
+
+def load_corpus():
+    """Retourne {nom du document: contenu brut} du corpus"""
+    corpus = {}
+    for name in sorted(os.listdir(CORPUS_DIR)):
+        if name.endswith(".xml"):
+            with open(os.path.join(CORPUS_DIR, name), "rb") as f:
+                corpus[name[:-4]] = f.read()
+    return corpus
+
+def build_benchmarks(corpus):
+    """Construit la liste des benchmarks: (nom, fonction appliquée à chaque élément, éléments)"""
+    parsed = {name: feedparser.parse(content) for name, content in corpus.items()}
+    raw_entries = [entry for result in parsed.values() for entry in result.entries]
+    feeds = {name: build_feed(result) for name, result in parsed.items()}
+    entries = [(entry, feed) for feed in feeds.values() for entry in feed.entries]
+    html_texts = [text for entry in raw_entries
+                  for text in (entry.get('summary'), *(c.get('value') for c in entry.get('content', ())))
+                  if text]
+    matcher = KeywordMatcher(DEFAULT_KEYWORDS)
+
+    def parse_cold(content):
+        # Vider le cache des textes pour mesurer un premier parsing
+        rss_parser._entry_text_cache.clear()
+        return parse_feed_content(content)
+
+    benchmarks = [(f"parse_feed_content[{name}]", parse_cold, [content]) for name, content in corpus.items()]
+    benchmarks += [
+        ("clean_html", clean_html, html_texts),
+        ("contains_keywords", lambda item: contains_keywords(item[0], matcher), entries),
+        ("find_keywords", lambda item: find_keywords(item[0], matcher), entries),
+        ("parse_date", parse_date, raw_entries),
+        ("get_entry_image", get_entry_image, raw_entries),
+        ("create_article_embed", lambda item: create_article_embed(item[0], item[1], "https://example.com/rss"), entries),
+    ]
+    return benchmarks
+
+def run_batch(function, items):
+    for item in items:
+        function(item)
+
+def measure(function, items):
+    """Mesure le débit et la mémoire allouée au pic d'un benchmark"""
+    run_batch(function, items)  # Échauffement
+
+    # Calibrer le nombre de lots par essai
+    repeat = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            run_batch(function, items)
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_TRIAL_TIME:
+            break
+        repeat *= 2
+
+    best = elapsed
+    for _ in range(TRIALS - 1):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            run_batch(function, items)
+        best = min(best, time.perf_counter() - started)
+
+    operations = repeat * len(items)
+    peaks = measure_peaks(function, items)
+    return {
+        "items": len(items),
+        "ops_per_sec": round(operations / best, 1),
+        "mean_us": round(best / operations * 1e6, 3),
+        "peak_alloc_bytes_per_op": round(sum(peaks) / len(peaks)),
+        "max_peak_alloc_bytes": max(peaks),
+    }
+
+def measure_peaks(function, items):
+    """Mémoire allouée au pic (au-delà de l'état initial) par chaque opération"""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for item in items:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            function(item)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline):
+    """Affiche l'évolution du débit par rapport à une référence"""
+    print(f"\nComparaison avec {baseline.get('revision') or 'la référence'}:")
+    for name, result in results.items():
+        reference = baseline["results"].get(name)
+        if not reference:
+            print(f"  {name:40} (nouveau)")
+            continue
+        change = (result["ops_per_sec"] / reference["ops_per_sec"] - 1) * 100
+        flag = ""
+        if change <= -REGRESSION_THRESHOLD:
+            flag = "  ⚠️ plus lent"
+        elif change >= REGRESSION_THRESHOLD:
+            flag = "  plus rapide"
+        print(f"  {name:40} {change:+7.1f} %{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks du bot RSS")
+    parser.add_argument("-o", "--output", help="Fichier JSON où enregistrer les résultats")
+    parser.add_argument("--compare", help="Fichier JSON de référence à comparer")
+    parser.add_argument("-k", "--filter", default="", help="Ne lancer que les benchmarks dont le nom contient ce texte")
+    args = parser.parse_args()
+
+    results = {}
+    for name, function, items in build_benchmarks(load_corpus()):
+        if args.filter not in name:
+            continue
+        results[name] = measure(function, items)
+        result = results[name]
+        print(f"{name:40} {result['ops_per_sec']:>12,.0f} op/s {result['mean_us']:>12.2f} µs/op "
+              f"{result['peak_alloc_bytes_per_op']:>10,} o/op (max {result['max_peak_alloc_bytes']:,} o)")
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "feedparser": feedparser.__version__,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nRésultats enregistrés dans {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import logging
 from datetime import datetime
 from config import DEFAULT_KEYWORDS
 from utils.storage import server_keywords, save_config
+from utils.keyword_matcher import invalidate_keyword_matcher
 from utils.embed_builder import create_confirmation_embed
 
 logger = logging.getLogger(__name__)
@@ -22,6 +23,7 @@ class KeywordCommands(commands.Cog):
 
         guild_id = str(ctx.guild.id)
         server_keywords[guild_id] = list(keywords)
+        invalidate_keyword_matcher(guild_id)
         save_config()  # Sauvegarder la configuration
 
         # Créer un embed pour la confirmation
@@ -68,6 +70,7 @@ class KeywordCommands(commands.Cog):
             await ctx.send("Tous les mots-clés spécifiés sont déjà dans la liste.")
             return
 
+        invalidate_keyword_matcher(guild_id)
         save_config()  # Sauvegarder la configuration
 
         # Créer un embed pour la confirmation
@@ -119,6 +122,7 @@ class KeywordCommands(commands.Cog):
             await ctx.send("Aucun des mots-clés spécifiés n'a été trouvé dans la liste.")
             return
 
+        invalidate_keyword_matcher(guild_id)
         save_config()  # Sauvegarder la configuration
 
         # Créer un embed pour la confirmation
@@ -156,6 +160,7 @@ class KeywordCommands(commands.Cog):
 
         keyword_count = len(server_keywords[guild_id])
         server_keywords[guild_id] = []
+        invalidate_keyword_matcher(guild_id)
         save_config()  # Sauvegarder la configuration
 
         # Créer un embed pour la confirmation
@@ -221,6 +226,7 @@ class KeywordCommands(commands.Cog):
         """Réinitialise les mots-clés avec la liste par défaut"""
         guild_id = str(ctx.guild.id)
         server_keywords[guild_id] = DEFAULT_KEYWORDS.copy()
+        invalidate_keyword_matcher(guild_id)
         save_config()  # Sauvegarder la configuration
 
         # Créer un embed pour la confirmation
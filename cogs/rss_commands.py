@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import feedparser
 import asyncio
 import logging
 from datetime import datetime
@@ -11,13 +10,24 @@ import sys
 import os
 # Ajouter le répertoire parent du répertoire courant au chemin de recherche
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.storage import rss_configs, server_keywords, save_config, log_channels
-from utils.rss_parser import get_color_for_url, contains_keywords, parse_date
+from utils.storage import rss_configs, server_keywords, save_config, log_channels, forget_feed, seen_entries, feed_schedules
+from utils.rss_parser import get_color_for_url, contains_keywords, find_keywords, parse_date
+from utils.keyword_matcher import get_keyword_matcher
+from utils.dedup import is_duplicate, is_near_duplicate
+from utils.metrics import Counter
 from utils.embed_builder import create_article_embed, create_confirmation_embed
 from utils.logger import send_log
+from utils.fetcher import fetch_and_parse, fetch_stats
+from utils.delivery import delivery_queue
+from utils.poller import (plan_cycle, fetch_cycle, fetch_if_modified, collect_new_entries, mark_entries_seen,
+                          record_check_error, check_totals, has_pending_entries, defer_entries, take_pending_entries,
+                          discard_pending_entries)
+from utils.scheduler import feed_scheduler
 
 logger = logging.getLogger(__name__)
 
+ARTICLES = Counter("rss_articles_total", "Nouveaux articles par résultat (publié ou filtré)", labels=("result",))
+
 class RSSCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -26,7 +36,7 @@ class RSSCommands(commands.Cog):
     async def add_rss(self, ctx, channel: discord.TextChannel, rss_url: str):
         """Ajoute un flux RSS à surveiller"""
         try:
-            feed = feedparser.parse(rss_url)
+            feed = await fetch_and_parse(rss_url)
             if feed.bozo and not feed.entries:
                 await ctx.send("URL RSS invalide ou inaccessible !")
                 return
@@ -37,16 +47,16 @@ class RSSCommands(commands.Cog):
             elif rss_configs[guild_id]["channel"] != channel.id:
                 rss_configs[guild_id]["channel"] = channel.id
             
-            # Stocker l'ID du dernier article
-            last_entry_id = None
-            if feed.entries:
-                last_entry_id = getattr(feed.entries[0], 'id', None) or getattr(feed.entries[0], 'link', None)
+            # Marquer les articles actuels comme vus si le flux n'est pas encore suivi
+            if rss_url not in seen_entries:
+                mark_entries_seen(rss_url, feed)
             
-            rss_configs[guild_id]["feeds"][rss_url] = last_entry_id
+            rss_configs[guild_id]["feeds"][rss_url] = None
             save_config()  # Sauvegarder la configuration
+            feed_scheduler.refresh()
             
             # Obtenir le titre du flux
-            feed_title = feed.feed.title if hasattr(feed.feed, 'title') else "Flux RSS"
+            feed_title = feed.title or "Flux RSS"
             
             # Créer un embed moderne pour la confirmation
             embed = discord.Embed(
@@ -57,8 +67,8 @@ class RSSCommands(commands.Cog):
             )
             
             # Ajouter une image si disponible
-            if hasattr(feed.feed, 'image') and hasattr(feed.feed.image, 'href'):
-                embed.set_thumbnail(url=feed.feed.image.href)
+            if feed.image:
+                embed.set_thumbnail(url=feed.image)
             
             embed.add_field(name="📡 URL du flux", value=f"```{rss_url}```", inline=False)
             embed.add_field(name="📢 Canal de publication", value=channel.mention, inline=True)
@@ -99,7 +109,10 @@ class RSSCommands(commands.Cog):
             return
 
         del rss_configs[guild_id]["feeds"][rss_url]
+        discard_pending_entries(guild_id, rss_url)
+        forget_feed(rss_url)
         save_config()  # Sauvegarder la configuration
+        feed_scheduler.refresh()
 
         # Créer un embed moderne pour la confirmation
         embed = create_confirmation_embed(
@@ -153,7 +166,7 @@ class RSSCommands(commands.Cog):
 
         # Ajouter les flux RSS
         for i, url in enumerate(rss_configs[guild_id]["feeds"].keys(), 1):
-            embed.add_field(name=f"📡 Flux {i}", value=f"```{url}```", inline=False)
+            embed.add_field(name=f"📡 Flux {i}", value=f"```{url}```{format_fetch_stats(url)}{format_feed_health(url)}", inline=False)
 
         # Ajouter des informations sur le filtrage
         if guild_id in server_keywords and server_keywords[guild_id]:
@@ -175,7 +188,7 @@ class RSSCommands(commands.Cog):
     async def test_rss(self, ctx, rss_url: str):
         """Teste un flux RSS configuré"""
         try:
-            feed = feedparser.parse(rss_url)
+            feed = await fetch_and_parse(rss_url)
             if not feed.entries:
                 await ctx.send("Aucune entrée trouvée dans le flux RSS.")
                 return
@@ -186,7 +199,7 @@ class RSSCommands(commands.Cog):
             guild_id = str(ctx.guild.id)
             keywords = server_keywords.get(guild_id, [])
             
-            if keywords and not contains_keywords(entry, keywords):
+            if keywords and not contains_keywords(entry, get_keyword_matcher(guild_id)):
                 # Créer un embed pour indiquer que l'article ne contient pas de mots-clés
                 embed = create_confirmation_embed(
                     title="⚠️ Test de filtrage",
@@ -242,6 +255,52 @@ class RSSCommands(commands.Cog):
             title="🔄 Vérification forcée"
         )
 
+    @commands.command(name="batchrss")
+    @commands.has_permissions(manage_messages=True)  # Limite aux modérateurs
+    async def batch_rss(self, ctx, enabled: bool):
+        """Active ou désactive le regroupement des articles (jusqu'à 10 par message)"""
+        guild_id = str(ctx.guild.id)
+        if guild_id not in rss_configs:
+            await ctx.send("Aucun flux RSS n'est configuré pour ce serveur !")
+            return
+
+        rss_configs[guild_id]["batch_embeds"] = enabled
+        save_config()
+
+        embed = create_confirmation_embed(
+            title="📦 Regroupement des articles",
+            description=batch_description(enabled),
+            color=discord.Color.green() if enabled else discord.Color.orange(),
+            author=ctx.author
+        )
+
+        await ctx.send(embed=embed)
+        logger.info(f"Regroupement des articles {'activé' if enabled else 'désactivé'} pour le serveur {guild_id}")
+
+    @commands.command(name="webhookrss")
+    @commands.has_permissions(manage_messages=True)  # Limite aux modérateurs
+    async def webhook_rss(self, ctx, enabled: bool):
+        """Active ou désactive la publication des articles via un webhook"""
+        guild_id = str(ctx.guild.id)
+        if guild_id not in rss_configs:
+            await ctx.send("Aucun flux RSS n'est configuré pour ce serveur !")
+            return
+
+        rss_configs[guild_id]["webhook_delivery"] = enabled
+        save_config()
+        # Redemander un webhook au prochain envoi (la permission a pu être accordée depuis un refus)
+        delivery_queue.forget_webhook(rss_configs[guild_id]["channel"])
+
+        embed = create_confirmation_embed(
+            title="🪝 Publication via webhook",
+            description=webhook_description(enabled),
+            color=discord.Color.green() if enabled else discord.Color.orange(),
+            author=ctx.author
+        )
+
+        await ctx.send(embed=embed)
+        logger.info(f"Publication via webhook {'activée' if enabled else 'désactivée'} pour le serveur {guild_id}")
+
     async def check_rss_once(self, ctx):
         """Vérifie les flux RSS une seule fois et envoie un rapport"""
         try:
@@ -249,70 +308,43 @@ class RSSCommands(commands.Cog):
             new_articles_count = 0
             checked_feeds = 0
             
+            # Télécharger et parser une seule fois chaque flux unique
+            plan = plan_cycle(rss_configs)
+            force = {rss_url for rss_url, guild_ids in plan.items() if can_publish_pending(self.bot, rss_url, guild_ids)}
+            feeds, stats = await fetch_cycle(plan, force)
+            new_entries = collect_new_entries(plan, feeds)
+            
             for guild_id, config in list(rss_configs.items()):
                 channel = self.bot.get_channel(config["channel"])
                 if not channel:
                     logger.warning(f"Channel introuvable pour guild {guild_id}")
+                    # Garder les nouveaux articles jusqu'au retour du canal
+                    for rss_url in list(config["feeds"]):
+                        defer_entries(guild_id, rss_url, new_entries.get(rss_url, []))
                     continue
 
-                # Obtenir les mots-clés pour ce serveur
-                keywords = server_keywords.get(guild_id, [])
+                # Obtenir les mots-clés compilés pour ce serveur
+                matcher = get_keyword_matcher(guild_id)
+                batch = config.get("batch_embeds", False)
+                webhook = config.get("webhook_delivery", False)
                 
-                for rss_url, last_id in list(config["feeds"].items()):
+                for rss_url in list(config["feeds"]):
                     try:
                         logger.info(f"Vérification du flux: {rss_url}")
-                        feed = feedparser.parse(rss_url)
-                        checked_feeds += 1
-                        
-                        if not feed.entries:
-                            logger.warning(f"Aucune entrée dans le flux: {rss_url}")
+                        if rss_url not in feeds:  # Flux en pause, ou ajouté pendant la vérification
                             continue
-
-                        # Initialiser last_id si c'est la première vérification
-                        if last_id is None:
-                            entry_id = getattr(feed.entries[0], 'id', None) or getattr(feed.entries[0], 'link', None)
-                            rss_configs[guild_id]["feeds"][rss_url] = entry_id
-                            save_config()  # Sauvegarder la configuration
-                            logger.info(f"Premier ID enregistré pour {rss_url}: {entry_id}")
+                        feed = feeds[rss_url]
+                        if isinstance(feed, Exception):
+                            raise feed
+                        checked_feeds += 1
+                        if feed is None:  # Flux inchangé depuis la dernière vérification
                             continue
-
-                        # Trouver les nouvelles entrées
-                        new_entries = []
-                        for entry in feed.entries:
-                            entry_id = getattr(entry, 'id', None) or getattr(entry, 'link', None)
-                            if entry_id == last_id:
-                                break
-                            new_entries.append(entry)
                         
-                        # Envoyer les nouvelles entrées
-                        for entry in reversed(new_entries):  # Envoyer dans l'ordre chronologique
-                            try:
-                                # Vérifier si l'article contient des mots-clés (si configurés)
-                                if keywords and not contains_keywords(entry, keywords):
-                                    logger.info(f"Article filtré (ne contient pas de mots-clés): {entry.title}")
-                                    continue
-                                
-                                # Créer un embed pour l'article
-                                embed = create_article_embed(entry, feed, rss_url)
-                                
-                                await channel.send(embed=embed)
-                                new_articles_count += 1
-                                logger.info(f"Nouvel article envoyé: {entry.title}")
-                            except Exception as e:
-                                logger.error(f"Erreur lors de l'envoi d'un article: {e}")
-
-                        # Mettre à jour le dernier ID
-                        if feed.entries:
-                            entry_id = getattr(feed.entries[0], 'id', None) or getattr(feed.entries[0], 'link', None)
-                            rss_configs[guild_id]["feeds"][rss_url] = entry_id
-                            save_config()  # Sauvegarder la configuration
-                            logger.info(f"ID mis à jour pour {rss_url}: {entry_id}")
+                        entries = take_pending_entries(guild_id, rss_url, feed, new_entries[rss_url])
+                        new_articles_count += publish_new_entries(channel, rss_url, feed, entries, matcher, batch, webhook)
                     
                     except Exception as e:
                         logger.error(f"Erreur pour le flux {rss_url}: {e}")
-                    
-                    # Pause entre chaque flux pour éviter de surcharger
-                    await asyncio.sleep(1)  # Pause plus courte pour la vérification forcée
 
             # Envoyer un rapport de la vérification
             embed = create_confirmation_embed(
@@ -324,7 +356,11 @@ class RSSCommands(commands.Cog):
             
             embed.add_field(name="📊 Résultats", value=f"""
 • Flux vérifiés: **{checked_feeds}**
+• Flux inchangés: **{stats['not_modified'] + stats['unchanged']}**
+• Flux en pause non vérifiés: **{stats['paused']}**
 • Nouveaux articles publiés: **{new_articles_count}**
+• Flux en attente de vérification: **{feed_scheduler.depth}** (retard: {feed_scheduler.lag:.0f}s)
+• Vérifications depuis le démarrage: **{sum(check_totals.values())}** ({check_totals['parsed']} parsées, {check_totals['not_modified'] + check_totals['unchanged']} inchangées, {check_totals['errors']} erreurs)
             """, inline=False)
             
             await ctx.send(embed=embed)
@@ -362,7 +398,7 @@ class RSSCommands(commands.Cog):
         try:
             await interaction.response.defer(ephemeral=False)
             
-            feed = feedparser.parse(rss_url)
+            feed = await fetch_and_parse(rss_url)
             if feed.bozo and not feed.entries:
                 await interaction.followup.send("URL RSS invalide ou inaccessible !")
                 return
@@ -373,16 +409,16 @@ class RSSCommands(commands.Cog):
             elif rss_configs[guild_id]["channel"] != channel.id:
                 rss_configs[guild_id]["channel"] = channel.id
             
-            # Stocker l'ID du dernier article
-            last_entry_id = None
-            if feed.entries:
-                last_entry_id = getattr(feed.entries[0], 'id', None) or getattr(feed.entries[0], 'link', None)
+            # Marquer les articles actuels comme vus si le flux n'est pas encore suivi
+            if rss_url not in seen_entries:
+                mark_entries_seen(rss_url, feed)
             
-            rss_configs[guild_id]["feeds"][rss_url] = last_entry_id
+            rss_configs[guild_id]["feeds"][rss_url] = None
             save_config()  # Sauvegarder la configuration
+            feed_scheduler.refresh()
             
             # Obtenir le titre du flux
-            feed_title = feed.feed.title if hasattr(feed.feed, 'title') else "Flux RSS"
+            feed_title = feed.title or "Flux RSS"
             
             # Créer un embed moderne pour la confirmation
             embed = discord.Embed(
@@ -393,8 +429,8 @@ class RSSCommands(commands.Cog):
             )
             
             # Ajouter une image si disponible
-            if hasattr(feed.feed, 'image') and hasattr(feed.feed.image, 'href'):
-                embed.set_thumbnail(url=feed.feed.image.href)
+            if feed.image:
+                embed.set_thumbnail(url=feed.image)
             
             embed.add_field(name="📡 URL du flux", value=f"```{rss_url}```", inline=False)
             embed.add_field(name="📢 Canal de publication", value=channel.mention, inline=True)
@@ -437,7 +473,10 @@ class RSSCommands(commands.Cog):
             return
 
         del rss_configs[guild_id]["feeds"][rss_url]
+        discard_pending_entries(guild_id, rss_url)
+        forget_feed(rss_url)
         save_config()  # Sauvegarder la configuration
+        feed_scheduler.refresh()
 
         # Créer un embed moderne pour la confirmation
         embed = create_confirmation_embed(
@@ -492,7 +531,7 @@ class RSSCommands(commands.Cog):
 
         # Ajouter les flux RSS
         for i, url in enumerate(rss_configs[guild_id]["feeds"].keys(), 1):
-            embed.add_field(name=f"📡 Flux {i}", value=f"```{url}```", inline=False)
+            embed.add_field(name=f"📡 Flux {i}", value=f"```{url}```{format_fetch_stats(url)}{format_feed_health(url)}", inline=False)
 
         # Ajouter des informations sur le filtrage
         if guild_id in server_keywords and server_keywords[guild_id]:
@@ -516,7 +555,7 @@ class RSSCommands(commands.Cog):
         await interaction.response.defer(ephemeral=False)
         
         try:
-            feed = feedparser.parse(rss_url)
+            feed = await fetch_and_parse(rss_url)
             if not feed.entries:
                 await interaction.followup.send("Aucune entrée trouvée dans le flux RSS.")
                 return
@@ -527,7 +566,7 @@ class RSSCommands(commands.Cog):
             guild_id = str(interaction.guild_id)
             keywords = server_keywords.get(guild_id, [])
             
-            if keywords and not contains_keywords(entry, keywords):
+            if keywords and not contains_keywords(entry, get_keyword_matcher(guild_id)):
                 # Créer un embed pour indiquer que l'article ne contient pas de mots-clés
                 embed = create_confirmation_embed(
                     title="⚠️ Test de filtrage",
@@ -593,110 +632,212 @@ class RSSCommands(commands.Cog):
             title="🔄 Vérification forcée"
         )
 
-# Fonction pour vérifier les flux RSS (utilisée par la tâche périodique)
-async def check_rss_feeds(bot):
-    """Vérifie périodiquement les flux RSS pour de nouveaux articles"""
+    @app_commands.command(name="batchrss", description="Active ou désactive le regroupement des articles (jusqu'à 10 par message)")
+    @app_commands.describe(enabled="Regrouper les nouveaux articles d'un même canal dans un seul message")
+    async def slash_batch_rss(self, interaction: discord.Interaction, enabled: bool):
+        # Vérifier les permissions
+        if not interaction.user.guild_permissions.manage_messages:
+            await interaction.response.send_message("❌ Vous n'avez pas les permissions nécessaires pour utiliser cette commande.", ephemeral=True)
+            return
+
+        guild_id = str(interaction.guild_id)
+        if guild_id not in rss_configs:
+            await interaction.response.send_message("Aucun flux RSS n'est configuré pour ce serveur !")
+            return
+
+        rss_configs[guild_id]["batch_embeds"] = enabled
+        save_config()
+
+        embed = create_confirmation_embed(
+            title="📦 Regroupement des articles",
+            description=batch_description(enabled),
+            color=discord.Color.green() if enabled else discord.Color.orange(),
+            author=interaction.user
+        )
+
+        await interaction.response.send_message(embed=embed)
+        logger.info(f"Regroupement des articles {'activé' if enabled else 'désactivé'} pour le serveur {guild_id}")
+
+    @app_commands.command(name="webhookrss", description="Active ou désactive la publication des articles via un webhook")
+    @app_commands.describe(enabled="Publier les articles via un webhook du canal (permission Gérer les webhooks requise)")
+    async def slash_webhook_rss(self, interaction: discord.Interaction, enabled: bool):
+        # Vérifier les permissions
+        if not interaction.user.guild_permissions.manage_messages:
+            await interaction.response.send_message("❌ Vous n'avez pas les permissions nécessaires pour utiliser cette commande.", ephemeral=True)
+            return
+
+        guild_id = str(interaction.guild_id)
+        if guild_id not in rss_configs:
+            await interaction.response.send_message("Aucun flux RSS n'est configuré pour ce serveur !")
+            return
+
+        rss_configs[guild_id]["webhook_delivery"] = enabled
+        save_config()
+        # Redemander un webhook au prochain envoi (la permission a pu être accordée depuis un refus)
+        delivery_queue.forget_webhook(rss_configs[guild_id]["channel"])
+
+        embed = create_confirmation_embed(
+            title="🪝 Publication via webhook",
+            description=webhook_description(enabled),
+            color=discord.Color.green() if enabled else discord.Color.orange(),
+            author=interaction.user
+        )
+
+        await interaction.response.send_message(embed=embed)
+        logger.info(f"Publication via webhook {'activée' if enabled else 'désactivée'} pour le serveur {guild_id}")
+
+def format_fetch_stats(rss_url):
+    """Ligne de statistiques de téléchargement d'un flux pour listrss (vide si jamais téléchargé)"""
+    stats = fetch_stats.get(rss_url)
+    if not stats or not stats.requests:
+        return ""
+    line = f"⏱️ {stats.average_duration:.2f}s en moyenne • {stats.last_size / 1024:.0f} Ko"
+    if stats.timeouts:
+        line += f" • {stats.timeouts} délai(s) dépassé(s)"
+    if stats.oversized:
+        line += f" • {stats.oversized} fois trop volumineux"
+    return line + "\n"
+
+def format_feed_health(rss_url):
+    """Texte d'état d'un flux pour listrss (vide si le flux fonctionne)"""
+    schedule = feed_schedules.get(rss_url, {})
+    failures = schedule.get("failures")
+    if not failures:
+        return ""
+    if schedule.get("state") == "open":
+        return f"⛔ En pause après {failures} échecs, prochain essai <t:{int(schedule['next_due'])}:R>"
+    return f"⚠️ {failures} échec(s) consécutif(s): {schedule.get('last_error', '')}"
+
+def batch_description(enabled):
+    """Texte de confirmation de l'option de regroupement"""
+    if enabled:
+        return "Les nouveaux articles seront regroupés jusqu'à 10 par message."
+    return "Chaque nouvel article sera publié dans son propre message."
+
+def webhook_description(enabled):
+    """Texte de confirmation de l'option de publication via webhook"""
+    if enabled:
+        return ("Les articles seront publiés via un webhook du canal. "
+                "Sans la permission « Gérer les webhooks », le bot publiera normalement.")
+    return "Les articles seront publiés directement par le bot."
+
+def can_publish_pending(bot, rss_url, guild_ids):
+    """Indique si un serveur abonné a des articles du flux en attente et de nouveau un canal pour les recevoir"""
+    return any(has_pending_entries(guild_id, rss_url) and bot.get_channel(rss_configs[guild_id]["channel"])
+               for guild_id in guild_ids)
+
+# Fonction pour publier les nouveaux articles d'un flux déjà parsé pour un serveur
+def publish_new_entries(channel, rss_url, feed, new_entries, matcher, batch=False, webhook=False):
+    """Met en file d'envoi les nouveaux articles d'un flux et retourne leur nombre
+
+    Avec `batch`, les articles sont regroupés jusqu'à 10 embeds par message.
+    Avec `webhook`, ils sont publiés via un webhook du canal.
+    """
+    published = 0
+    for entry in reversed(new_entries):  # Envoyer dans l'ordre chronologique
+        try:
+            # Vérifier si l'article contient des mots-clés (si configurés)
+            hits = find_keywords(entry, matcher) if matcher else []
+            if matcher and not hits:
+                logger.info(f"Article filtré (ne contient pas de mots-clés): {entry.title}")
+                ARTICLES.inc(result="filtered_keywords")
+                continue
+            
+            # Ignorer les copies d'un article déjà publié dans le canal (autre flux, même lien)
+            if is_duplicate(channel.id, entry):
+                logger.info(f"Article en double ignoré: {entry.title}")
+                ARTICLES.inc(result="duplicate")
+                continue
+            if is_near_duplicate(channel.id, entry):
+                logger.info(f"Article quasi identique à un article récent ignoré: {entry.title}")
+                ARTICLES.inc(result="near_duplicate")
+                continue
+            
+            # Créer un embed pour l'article et le confier à la file d'envoi
+            embed = create_article_embed(entry, feed, rss_url)
+            delivery_queue.enqueue(channel, embed, batch, webhook)
+            ARTICLES.inc(result="posted")
+            published += 1
+            if hits:
+                logger.info(f"Nouvel article en file d'envoi: {entry.title} (mots-clés: {', '.join(hits)})")
+            else:
+                logger.info(f"Nouvel article en file d'envoi: {entry.title}")
+        except Exception as e:
+            logger.error(f"Erreur lors de la préparation d'un article: {e}")
+    return published
+
+# Fonction pour vérifier un flux RSS (appelée par l'ordonnanceur à chaque échéance du flux)
+async def check_feed(bot, rss_url, guild_ids):
+    """Vérifie un flux RSS et publie ses nouveaux articles pour chaque serveur abonné"""
+    logger.debug(f"Vérification du flux: {rss_url}")
+    previous_failures = feed_schedules.get(rss_url, {}).get("failures", 0)
     try:
-        logger.info("Vérification des flux RSS...")
-        new_articles_count = 0
-        
-        for guild_id, config in list(rss_configs.items()):
-            # Envoyer un log au début de la vérification
+        status, feed = await fetch_if_modified(rss_url, can_publish_pending(bot, rss_url, guild_ids))
+    except Exception as e:
+        logger.error(f"Erreur pour le flux {rss_url}: {e}")
+        opened = record_check_error(rss_url, e)
+        save_config()
+
+        # Ne prévenir qu'au premier échec et à la mise en pause, pas à chaque essai
+        schedule = feed_schedules.get(rss_url, {})
+        if opened:
+            message = (f"Le flux `{rss_url}` est mis en pause après {schedule['failures']} échecs consécutifs. "
+                       f"Prochain essai <t:{int(schedule['next_due'])}:R>.\nDernière erreur: {str(e)}")
+            title = "⛔ Flux en pause"
+        elif schedule.get("failures") == 1:
+            message = f"Erreur lors de la vérification du flux `{rss_url}`: {str(e)}"
+            title = "❌ Erreur de vérification"
+        else:
+            return
+        for guild_id in guild_ids:
+            # Envoyer un log d'erreur
+            await send_log(bot, guild_id, message, color=discord.Color.red(), title=title)
+        return
+
+    if previous_failures:
+        for guild_id in guild_ids:
             await send_log(
                 bot, 
                 guild_id, 
-                f"Vérification des flux RSS en cours...", 
-                color=discord.Color.blue(),
-                title="🔄 Vérification des flux"
+                f"Le flux `{rss_url}` fonctionne de nouveau après {previous_failures} échecs.", 
+                color=discord.Color.green(),
+                title="✅ Flux rétabli"
             )
-            
-            channel = bot.get_channel(config["channel"])
-            if not channel:
-                logger.warning(f"Channel introuvable pour guild {guild_id}")
-                continue
 
-            # Obtenir les mots-clés pour ce serveur
-            keywords = server_keywords.get(guild_id, [])
-            guild_new_articles = 0
-            
-            for rss_url, last_id in list(config["feeds"].items()):
-                try:
-                    logger.info(f"Vérification du flux: {rss_url}")
-                    feed = feedparser.parse(rss_url)
-                    
-                    if not feed.entries:
-                        logger.warning(f"Aucune entrée dans le flux: {rss_url}")
-                        continue
-
-                    # Initialiser last_id si c'est la première vérification
-                    if last_id is None:
-                        entry_id = getattr(feed.entries[0], 'id', None) or getattr(feed.entries[0], 'link', None)
-                        rss_configs[guild_id]["feeds"][rss_url] = entry_id
-                        save_config()  # Sauvegarder la configuration
-                        logger.info(f"Premier ID enregistré pour {rss_url}: {entry_id}")
-                        continue
-
-                    # Trouver les nouvelles entrées
-                    new_entries = []
-                    for entry in feed.entries:
-                        entry_id = getattr(entry, 'id', None) or getattr(entry, 'link', None)
-                        if entry_id == last_id:
-                            break
-                        new_entries.append(entry)
-                    
-                    # Envoyer les nouvelles entrées
-                    for entry in reversed(new_entries):  # Envoyer dans l'ordre chronologique
-                        try:
-                            # Vérifier si l'article contient des mots-clés (si configurés)
-                            if keywords and not contains_keywords(entry, keywords):
-                                logger.info(f"Article filtré (ne contient pas de mots-clés): {entry.title}")
-                                continue
-                            
-                            # Créer un embed pour l'article
-                            embed = create_article_embed(entry, feed, rss_url)
-                            
-                            await channel.send(embed=embed)
-                            new_articles_count += 1
-                            guild_new_articles += 1
-                            logger.info(f"Nouvel article envoyé: {entry.title}")
-                        except Exception as e:
-                            logger.error(f"Erreur lors de l'envoi d'un article: {e}")
-
-                    # Mettre à jour le dernier ID
-                    if feed.entries:
-                        entry_id = getattr(feed.entries[0], 'id', None) or getattr(feed.entries[0], 'link', None)
-                        rss_configs[guild_id]["feeds"][rss_url] = entry_id
-                        save_config()  # Sauvegarder la configuration
-                        logger.info(f"ID mis à jour pour {rss_url}: {entry_id}")
-                
-                except Exception as e:
-                    logger.error(f"Erreur pour le flux {rss_url}: {e}")
-                    
-                    # Envoyer un log d'erreur
-                    await send_log(
-                        bot, 
-                        guild_id, 
-                        f"Erreur lors de la vérification du flux `{rss_url}`: {str(e)}", 
-                        color=discord.Color.red(),
-                        title="❌ Erreur de vérification"
-                    )
-                
-                # Pause entre chaque flux pour éviter de surcharger
-                await asyncio.sleep(2)
-            
-            # Envoyer un log à la fin de la vérification
+    if feed is None:  # Flux inchangé depuis la dernière vérification
+        save_config()  # Sauvegarder la planification du flux
+        return
+
+    new_entries = collect_new_entries({rss_url: guild_ids}, {rss_url: feed})[rss_url]
+
+    for guild_id in guild_ids:
+        config = rss_configs.get(guild_id)
+        if not config or rss_url not in config["feeds"]:  # Flux supprimé pendant la vérification
+            continue
+
+        channel = bot.get_channel(config["channel"])
+        if not channel:
+            logger.warning(f"Channel introuvable pour guild {guild_id}")
+            # Garder les nouveaux articles jusqu'au retour du canal
+            defer_entries(guild_id, rss_url, new_entries)
+            continue
+
+        entries = take_pending_entries(guild_id, rss_url, feed, new_entries)
+        if not entries:
+            continue
+        published = publish_new_entries(
+            channel, rss_url, feed, entries, get_keyword_matcher(guild_id),
+            config.get("batch_embeds", False), config.get("webhook_delivery", False)
+        )
+        if published:
+            logger.info(f"{published} nouveaux articles de {rss_url} pour le serveur {guild_id}")
             await send_log(
                 bot, 
                 guild_id, 
-                f"Vérification terminée. {guild_new_articles} nouveaux articles publiés.", 
+                f"{published} nouveaux articles publiés depuis `{rss_url}`.", 
                 color=discord.Color.green(),
-                title="✅ Vérification terminée"
+                title="📰 Nouveaux articles"
             )
 
-        logger.info(f"Cycle de vérification terminé. {new_articles_count} nouveaux articles publiés.")
-
-    except Exception as e:
-        logger.error(f"Erreur dans check_rss: {e}")
-
 async def setup(bot):
     await bot.add_cog(RSSCommands(bot))
\ No newline at end of file
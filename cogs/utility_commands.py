@@ -3,7 +3,7 @@ from discord.ext import commands
 from discord import app_commands
 import logging
 from datetime import datetime
-from config import PREFIX
+from config import PREFIX, POLL_MIN_INTERVAL, POLL_DEFAULT_INTERVAL, POLL_MAX_INTERVAL
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +28,8 @@ class UtilityCommands(commands.Cog):
 `{PREFIX}listrss` - Liste tous les flux RSS configurés
 `{PREFIX}testrss URL` - Teste un flux RSS
 `{PREFIX}checkrss` - Force une vérification immédiate des flux RSS
+`{PREFIX}batchrss on|off` - Regroupe les nouveaux articles (jusqu'à 10 par message)
+`{PREFIX}webhookrss on|off` - Publie les articles via un webhook du canal
 """, inline=False)
 
         # Commandes de filtrage
@@ -57,7 +59,7 @@ Si aucun mot-clé n'est configuré, tous les articles seront publiés.
 
         # Informations sur la fréquence de vérification
         embed.add_field(name="⏱️ Fréquence de vérification", value=f"""
-Le bot vérifie les flux RSS **toutes les 5 minutes** par défaut.
+{polling_description()}
 Utilisez `{PREFIX}checkrss` pour forcer une vérification immédiate.
 """, inline=False)
 
@@ -85,6 +87,8 @@ Utilisez `{PREFIX}checkrss` pour forcer une vérification immédiate.
 `{PREFIX}listrss` - Liste tous les flux RSS configurés
 `{PREFIX}testrss URL` - Teste un flux RSS
 `{PREFIX}checkrss` - Force une vérification immédiate des flux RSS
+`{PREFIX}batchrss on|off` - Regroupe les nouveaux articles (jusqu'à 10 par message)
+`{PREFIX}webhookrss on|off` - Publie les articles via un webhook du canal
 """, inline=False)
         
         # Commandes de filtrage
@@ -106,7 +110,7 @@ Si aucun mot-clé n'est configuré, tous les articles seront publiés.
         
         # Informations sur la fréquence de vérification
         embed.add_field(name="⏱️ Fréquence de vérification", value=f"""
-Le bot vérifie les flux RSS **toutes les 5 minutes** par défaut.
+{polling_description()}
 Utilisez `{PREFIX}checkrss` pour forcer une vérification immédiate.
 """, inline=False)
         
@@ -116,5 +120,20 @@ Utilisez `{PREFIX}checkrss` pour forcer une vérification immédiate.
         
         await interaction.followup.send(embed=embed)
 
+def format_duration(seconds):
+    """Durée lisible en français (ex.: 90 → "1 minute 30 secondes", 21600 → "6 heures")"""
+    parts = []
+    for unit, size in (("jour", 86400), ("heure", 3600), ("minute", 60), ("seconde", 1)):
+        count, seconds = divmod(int(seconds), size)
+        if count:
+            parts.append(f"{count} {unit}{'s' if count > 1 else ''}")
+    return " ".join(parts) or "0 seconde"
+
+def polling_description():
+    """Texte d'aide sur la fréquence de vérification, tiré de la configuration"""
+    return (f"Le bot adapte la fréquence de vérification au rythme de publication de chaque flux "
+            f"(**entre {format_duration(POLL_MIN_INTERVAL)} et {format_duration(POLL_MAX_INTERVAL)}**, "
+            f"{format_duration(POLL_DEFAULT_INTERVAL)} par défaut).")
+
 async def setup(bot):
     await bot.add_cog(UtilityCommands(bot))
\ No newline at end of file
@@ -4,8 +4,56 @@ PREFIX = "!"
 DATE_FORMAT = "%d %b %Y %H:%M:%S"
 CONFIG_FILE = "data/rss_config.json"
 ACTIVITY_CHANGE_INTERVAL = 10  # minutes
+# Configuration de la récupération des flux
+FETCH_CONCURRENCY = 20  # Nombre maximal de téléchargements simultanés
+FETCH_TIMEOUT = 30  # secondes au total par téléchargement
+FETCH_CONNECT_TIMEOUT = 10  # secondes pour établir la connexion
+FETCH_READ_TIMEOUT = 15  # secondes sans recevoir de données avant abandon
+FETCH_MAX_BYTES = 5 * 1024 * 1024  # octets: les flux plus gros sont abandonnés
+USER_AGENT = "RSSBot/3.0 (+https://github.com/itsaam/rss_bot)"
+FETCH_HOST_CONCURRENCY = 4  # Téléchargements simultanés au plus vers un même hôte
+FETCH_HOST_SPACING = 0.5  # secondes minimum entre deux requêtes vers un même hôte
+FETCH_MAX_RETRY_AFTER = 3600  # secondes: durée maximale de pause d'un hôte demandée par Retry-After
+PARSE_WORKERS = 0  # Processus de parsing (0 = parsing dans un thread)
+PARSE_POOL_MIN_SIZE = 64 * 1024  # octets: les flux plus petits restent parsés dans un thread
+SEEN_ENTRIES_LIMIT = 200  # Nombre d'articles déjà vus mémorisés par flux
+SAVE_DELAY = 2  # secondes de regroupement des sauvegardes de la configuration
+SAVE_DELAY_PER_FEED = 0.001  # secondes ajoutées au délai de sauvegarde par flux suivi (20 000 flux: 22 s)
+ENTRY_TEXT_CACHE_SIZE = 2048  # Nombre d'articles dont le texte nettoyé est gardé en cache
+DEDUP_TTL = 3 * 86400  # secondes pendant lesquelles un article publié bloque ses copies dans le canal
+DEDUP_MAX_ENTRIES = 5000  # Clés d'articles récents mémorisées par canal
+NEAR_DUPLICATE_THRESHOLD = 0.82  # Similarité (0-1) des empreintes à partir de laquelle deux articles sont des quasi-doublons (None = désactivé)
+STORAGE_BACKEND = "json"  # "json" (data/config.json) ou "sqlite" (data/config.db)
+# Configuration de la fréquence de vérification des flux
+POLL_MIN_INTERVAL = 120  # secondes entre deux vérifications d'un flux très actif
+POLL_DEFAULT_INTERVAL = 300  # secondes, tant que le rythme de publication est inconnu
+POLL_MAX_INTERVAL = 6 * 3600  # secondes entre deux vérifications d'un flux très calme
+POLL_INTERVAL_FACTOR = 0.5  # Fraction de l'intervalle de publication attendu entre deux vérifications
+POLL_HISTORY = 20  # Nombre d'articles récents utilisés pour estimer le rythme de publication
+SCHEDULER_WORKERS = 20  # Nombre de flux vérifiés simultanément
+SCHEDULER_JITTER = 0.1  # Fraction aléatoire de l'intervalle ajoutée à chaque échéance (étale la charge)
+SCHEDULER_SYNC_INTERVAL = 30  # secondes entre deux prises en compte des abonnements
+SCHEDULER_SUMMARY_INTERVAL = 600  # secondes entre deux résumés des vérifications dans les logs
+FEED_CIRCUIT_THRESHOLD = 5  # Échecs consécutifs avant de mettre un flux en pause
+FEED_CIRCUIT_OPEN_TIME = 6 * 3600  # secondes de la première pause (doublée à chaque nouvelle pause)
+FEED_CIRCUIT_MAX_OPEN_TIME = 7 * 86400  # secondes: durée maximale d'une pause
+# Configuration de l'envoi des articles
+DELIVERY_WORKERS = 10  # Nombre d'envois simultanés (sur des canaux différents)
+DELIVERY_CHANNEL_RATE = 5  # Messages par canal...
+DELIVERY_CHANNEL_PERIOD = 5  # ...par période de 5 secondes (limite Discord)
+DELIVERY_GLOBAL_RATE = 40  # Requêtes par seconde pour tout le bot (limite Discord: 50)
+DELIVERY_MAX_RETRIES = 5
+DELIVERY_BACKOFF = 1  # secondes (doublées à chaque réessai)
+DELIVERY_WEBHOOK_NAME = "RSS Bot"  # Nom des webhooks créés pour le mode webhook
+DELIVERY_WEBHOOK_RETRY = 3600  # secondes avant de réessayer de créer un webhook refusé (permission manquante)
 # Configuration pour les logs
 LOG_CHANNELS = {}  # Format: {"guild_id": channel_id}
+LOG_FLUSH_INTERVAL = 15  # secondes de regroupement des logs avant envoi
+LOG_MAX_EVENTS = 25  # Événements gardés par serveur et par envoi (limite Discord: 25 champs)
+LOG_MAX_MESSAGES = 20  # Messages de logs envoyés au plus par période de regroupement
+# Configuration des métriques (format Prometheus)
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = None  # Port du point d'accès /metrics (None = désactivé)
 # Liste des mots-clés pour le filtrage (par défaut)
 DEFAULT_KEYWORDS = [
     # Anglais
@@ -0,0 +1,29 @@
+import pytest
+
+# Ce fichier à la racine du dépôt y fait pointer le chemin d'import des tests
+# (config, utils, cogs), sans manipulation de sys.path.
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """État de stockage vide, sauvegardé dans un dossier temporaire"""
+    from utils import storage, keyword_matcher, dedup
+
+    monkeypatch.setattr(storage, "CONFIG_FILE", str(tmp_path / "config.json"))
+    monkeypatch.setattr(storage, "DATABASE_FILE", str(tmp_path / "config.db"))
+    for name, value in (("_dirty", False), ("_flush_task", None), ("_flush_lock", None),
+                        ("_seen_snapshots", {}), ("_seen_serialized", {}),
+                        ("_database", None), ("_last_written", {})):
+        monkeypatch.setattr(storage, name, value)
+    monkeypatch.setattr(keyword_matcher, "_matchers", {})
+    monkeypatch.setattr(dedup, "_indexes", {})
+    monkeypatch.setattr(dedup, "_near_indexes", {})
+
+    state = (storage.rss_configs, storage.server_keywords, storage.log_channels,
+             storage.feed_validators, storage.seen_entries, storage.feed_schedules)
+    for values in state:
+        values.clear()
+    yield storage
+    for values in state:
+        values.clear()
+    if storage._database is not None:
+        storage._database.close()
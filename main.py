@@ -3,9 +3,15 @@ from discord.ext import commands, tasks
 import logging
 import asyncio
 import random
+import functools
 import os
 from config import TOKEN, PREFIX, ACTIVITY_CHANGE_INTERVAL
-from utils.storage import load_config, rss_configs
+from utils.storage import load_config, flush_config, rss_configs
+from utils.fetcher import close_session, shutdown_parse_pool
+from utils.delivery import delivery_queue
+from utils.logger import log_sink
+from utils.scheduler import feed_scheduler
+from utils.metrics import start_metrics_server, stop_metrics_server
 
 # Configuration des logs
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -34,7 +40,10 @@ async def on_ready():
     load_config()
     
     # Démarrer les tâches
-    check_rss.start()
+    delivery_queue.start()
+    log_sink.start()
+    from cogs.rss_commands import check_feed
+    feed_scheduler.start(functools.partial(check_feed, bot))
     change_activity.start()
     
     # Définir l'activité initiale
@@ -56,17 +65,6 @@ async def change_activity():
     await bot.change_presence(activity=activity)
     logger.info(f"Activité changée: {activity.name}")
 
-@tasks.loop(minutes=5)
-async def check_rss():
-    """Vérifie périodiquement les flux RSS pour de nouveaux articles"""
-    from cogs.rss_commands import check_rss_feeds
-    await check_rss_feeds(bot)
-
-@check_rss.before_loop
-async def before_check_rss():
-    """Attend que le bot soit prêt avant de démarrer la tâche"""
-    await bot.wait_until_ready()
-
 # Charger les extensions (cogs)
 async def load_extensions():
     for filename in os.listdir("./cogs"):
@@ -77,7 +75,17 @@ async def load_extensions():
 async def main():
     async with bot:
         await load_extensions()
-        await bot.start(TOKEN)
+        await start_metrics_server()
+        try:
+            await bot.start(TOKEN)
+        finally:
+            await stop_metrics_server()
+            await feed_scheduler.stop()
+            await log_sink.stop()
+            await delivery_queue.stop()
+            await flush_config()
+            await close_session()
+            shutdown_parse_pool()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,147 @@
+import random
+import pytest
+
+from config import NEAR_DUPLICATE_THRESHOLD
+from utils.models import Entry
+from utils import dedup
+from utils.dedup import NearDuplicateIndex, RecentIndex, canonical_url, entry_keys, is_duplicate, is_near_duplicate
+
+# Même dépêche reprise par deux sources: (titre, résumé) de chaque version
+REWORDED_STORIES = [
+    (('Cancer du sein : une IA détecte les tumeurs deux ans plus tôt',
+      "Un algorithme développé par des chercheurs de l'Institut Curie repère sur les mammographies des signes de cancer du sein jusqu'à deux ans avant le diagnostic des radiologues."),
+     ('Cancer du sein : une intelligence artificielle détecte les tumeurs deux ans plus tôt',
+      "Un algorithme mis au point par des chercheurs de l'Institut Curie repère sur les mammographies des signes de cancer du sein jusqu'à deux ans avant le diagnostic des radiologues.")),
+    (('Google unveils new AI model for medical imaging',
+      'Google on Tuesday unveiled a new artificial intelligence model that can read chest X-rays and CT scans, the company said in a blog post.'),
+     ('Google unveils new AI model for medical imaging - Reuters',
+      'Google on Tuesday unveiled a new artificial intelligence model that can read chest X-rays and CT scans, the company said in a statement.')),
+    (('OpenAI lance un assistant médical pour les hôpitaux',
+      "La société américaine OpenAI a annoncé mercredi le lancement d'un assistant destiné aux médecins hospitaliers, capable de résumer les dossiers des patients."),
+     ('OpenAI lance un assistant médical destiné aux hôpitaux',
+      "La société américaine OpenAI a annoncé ce mercredi le lancement d'un assistant destiné aux médecins hospitaliers, capable de résumer les dossiers médicaux des patients.")),
+    (('FDA clears AI tool that flags strokes on CT scans',
+      'The U.S. Food and Drug Administration has cleared an artificial intelligence tool that automatically flags suspected strokes on CT scans and alerts specialists.'),
+     ('FDA approves AI tool that flags strokes on CT scans',
+      'The US Food and Drug Administration has cleared an artificial intelligence tool that automatically flags suspected strokes on CT scans and alerts stroke specialists.')),
+    (("Le gouvernement présente sa stratégie nationale pour l'IA en santé",
+      "Le ministre de la Santé a présenté jeudi une stratégie nationale visant à accélérer l'usage de l'intelligence artificielle dans les hôpitaux publics d'ici 2030."),
+     ("Le gouvernement dévoile sa stratégie nationale pour l'IA en santé",
+      "Le ministre de la Santé a présenté jeudi une stratégie nationale visant à accélérer l'usage de l'intelligence artificielle dans les hôpitaux publics d'ici à 2030.")),
+    (('DeepMind AI predicts structure of nearly all known proteins',
+      'DeepMind said its AlphaFold system has predicted the structure of nearly every protein known to science, a resource that could speed up drug discovery.'),
+     ("DeepMind's AI predicts structures of nearly all known proteins",
+      'DeepMind said on Thursday its AlphaFold system has predicted the structure of almost every protein known to science, a resource that could speed drug discovery.')),
+    (("Une start-up lyonnaise lève 30 millions d'euros pour son IA de diagnostic",
+      "La jeune pousse, qui développe un logiciel d'aide au diagnostic en dermatologie, compte utiliser ces fonds pour se développer en Europe et aux États-Unis."),
+     ('Une start-up lyonnaise lève 30 millions pour son IA de diagnostic',
+      "La jeune pousse, qui développe un logiciel d'aide au diagnostic en dermatologie, compte utiliser ces fonds pour accélérer son développement en Europe et aux États-Unis.")),
+    (('Study finds AI chatbot answers rival doctors on patient questions',
+      'Researchers found that responses from an AI chatbot to patient questions posted online were rated higher in quality and empathy than those written by physicians.'),
+     ("AI chatbot answers rival doctors' responses to patient questions, study finds",
+      'Researchers found that responses from an AI chatbot to patient questions posted online were rated higher for quality and empathy than those written by physicians.')),
+    (("L'AP-HP déploie un outil d'IA pour lire les radiographies aux urgences",
+      "L'Assistance publique-Hôpitaux de Paris va équiper ses services d'urgences d'un logiciel d'intelligence artificielle chargé de repérer les fractures sur les radiographies."),
+     ("L'AP-HP déploie une IA pour lire les radiographies aux urgences",
+      "L'Assistance publique - Hôpitaux de Paris va équiper ses services d'urgences d'un logiciel d'intelligence artificielle chargé de détecter les fractures sur les radiographies.")),
+    (('Microsoft and Nuance launch AI that writes clinical notes',
+      "Microsoft's Nuance unit launched a tool that listens to doctor-patient conversations and automatically drafts clinical notes for the electronic health record."),
+     ("Microsoft's Nuance launches AI tool that drafts clinical notes",
+      "Microsoft's Nuance unit has launched a tool that listens to doctor-patient conversations and automatically drafts clinical notes in the electronic health record.")),
+]
+
+# Articles différents sur les mêmes sujets, qui doivent tous être publiés
+DISTINCT_STORIES = [story for story, _ in REWORDED_STORIES] + [
+    ("L'IA aide à détecter le cancer du poumon sur les scanners",
+     'Des radiologues de Lille testent un logiciel qui repère les nodules pulmonaires sur les scanners thoraciques, avec des résultats encourageants selon une première étude.'),
+    ('AI model detects breast cancer in mammograms, study says',
+     'A study published in Radiology found that an AI model detected breast cancer in screening mammograms as accurately as two radiologists working together.'),
+    ("Google's AI chatbot passes US medical licensing exam",
+     'Google said its Med-PaLM 2 model scored 85 percent on questions in the style of the US medical licensing exam, performing at an expert doctor level.'),
+    ("Le ministère de la Santé lance un appel à projets sur l'IA",
+     "Le ministère de la Santé ouvre un appel à projets doté de 50 millions d'euros pour financer des outils d'intelligence artificielle dans les hôpitaux."),
+    ('FDA issues draft guidance on AI-enabled medical devices',
+     'The Food and Drug Administration issued draft guidance on how makers of AI-enabled medical devices should document changes to their algorithms.'),
+    ('Une IA prédit le risque de cancer du pancréas à partir des dossiers médicaux',
+     'Des chercheurs ont entraîné un modèle sur des millions de dossiers médicaux danois et américains pour identifier les patients à risque de cancer du pancréas.'),
+]
+
+def make_entry(story, link):
+    title, description = story
+    return Entry(id=link, link=link, title=title, description=description, search_text="",
+                 published=None, timestamp=None, image=None, categories=[], author=None)
+
+class FakeClock:
+    """Remplace le module time de utils.dedup pour faire avancer l'horloge à la main"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.mark.parametrize("url, expected", [
+    ("http://www.Example.com/article/", "https://example.com/article"),
+    ("https://example.com:443/article#comments", "https://example.com/article"),
+    ("https://example.com:8080/article", "https://example.com:8080/article"),
+    ("https://example.com/article?utm_source=rss&utm_medium=feed&fbclid=x", "https://example.com/article"),
+    ("https://example.com/article?b=2&xtor=RSS-1&a=1", "https://example.com/article?a=1&b=2"),
+    ("  https://example.com/  ", "https://example.com/"),
+    ("http://[::1", "http://[::1"),  # Lien invalide: gardé tel quel
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+def test_same_link_from_another_feed_is_a_duplicate():
+    original = make_entry(("Titre", ""), "https://www.example.com/article?utm_source=feed-a")
+    copy = make_entry(("Autre titre", ""), "http://example.com/article/?utm_source=feed-b")
+    assert not is_duplicate("same-link", original)
+    assert is_duplicate("same-link", copy)
+    assert not is_duplicate("other-channel", copy)
+
+def test_recent_index_expires_old_keys(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(dedup, "time", clock)
+    index = RecentIndex(ttl=60, maxlen=100)
+    assert not index.check_and_add([b"a"])
+    clock.now += 30
+    assert index.check_and_add([b"a"])
+    clock.now += 31
+    assert not index.check_and_add([b"a"])  # Plus de 60 s après son ajout
+    assert len(index) == 1
+
+def test_recent_index_evicts_oldest_keys_beyond_maxlen():
+    index = RecentIndex(ttl=60, maxlen=3)
+    for key in (b"a", b"b", b"c", b"d"):
+        assert not index.check_and_add([key])
+    assert len(index) == 3
+    assert not index.check_and_add([b"a"])
+    assert index.check_and_add([b"d"])
+
+def test_entry_keys_use_link_and_distinct_id():
+    entry = make_entry(("Titre", ""), "https://example.com/article")
+    assert len(entry_keys(entry)) == 1
+    entry.id = "urn:uuid:1234"
+    assert len(entry_keys(entry)) == 2
+
+@pytest.mark.parametrize("original, copy", REWORDED_STORIES)
+def test_reworded_story_is_suppressed(original, copy):
+    channel_id = f"reworded-{original[0]}"
+    assert not is_near_duplicate(channel_id, make_entry(original, "https://example.com/original"))
+    assert is_near_duplicate(channel_id, make_entry(copy, "https://news.example.org/copy"))
+
+def test_distinct_stories_are_kept():
+    for number, story in enumerate(DISTINCT_STORIES):
+        assert not is_near_duplicate("distinct", make_entry(story, f"https://example.com/{number}")), story[0]
+
+def test_index_finds_every_fingerprint_within_distance():
+    rng = random.Random(0)
+    index = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD, maxlen=10_000)
+    fingerprints = [rng.getrandbits(64) for _ in range(2000)]
+    for fingerprint in fingerprints:
+        index.check_and_add(fingerprint)
+
+    for fingerprint in fingerprints[:500]:
+        near = fingerprint
+        for bit in rng.sample(range(64), rng.randint(1, index.max_distance)):
+            near ^= 1 << bit
+        assert index.check_and_add(near)
@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+from datetime import datetime, timezone
+
+from utils.models import Entry, FeedMeta
+from utils.seen_entries import SeenEntries
+from utils.poller import collect_new_entries, detect_new_entries
+from cogs import rss_commands
+
+FEED_URL = "https://example.com/rss"
+
+def make_entry(number):
+    link = f"https://example.com/articles/{number}"
+    return Entry(id=link, link=link, title=f"Article {number}", description="", search_text=f"article {number}",
+                 published=datetime(2024, 1, number, tzinfo=timezone.utc), timestamp=None, image=None, categories=[], author=None)
+
+def make_feed(*numbers):
+    """Flux dont les articles sont donnés du plus récent au plus ancien"""
+    return FeedMeta(title="Flux", link="https://example.com", image=None, bozo=False, update_interval=None,
+                    entries=[make_entry(number) for number in numbers])
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+
+class FakeBot:
+    def __init__(self, *channel_ids):
+        self.channels = set(channel_ids)
+
+    def get_channel(self, channel_id):
+        return FakeChannel(channel_id) if channel_id in self.channels else None
+
+class FakeDeliveryQueue:
+    def __init__(self):
+        self.sent = []  # [(channel_id, titre de l'article)]
+
+    def enqueue(self, channel, embed, batch=False, webhook=False):
+        self.sent.append((channel.id, embed.title))
+
+@pytest.fixture
+def delivery(storage, monkeypatch):
+    """Vérifications par check_feed: flux servi par `feeds`, articles envoyés dans `delivery.sent`"""
+    queue = FakeDeliveryQueue()
+    queue.feeds = []
+    queue.forced = []
+
+    async def fetch_if_modified(url, force=False):
+        queue.forced.append(force)
+        return "parsed", queue.feeds.pop(0)
+
+    async def send_log(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(rss_commands, "fetch_if_modified", fetch_if_modified)
+    monkeypatch.setattr(rss_commands, "send_log", send_log)
+    monkeypatch.setattr(rss_commands, "delivery_queue", queue)
+    return queue
+
+def subscribe(storage, guild_id, channel_id, last_id=None):
+    storage.rss_configs[guild_id] = {"channel": channel_id, "feeds": {FEED_URL: last_id}}
+
+def check(bot, delivery, feed):
+    delivery.feeds.append(feed)
+    asyncio.run(rss_commands.check_feed(bot, FEED_URL, list(rss_commands.rss_configs)))
+
+def test_seen_entries_evict_oldest_beyond_limit():
+    seen = SeenEntries(3)
+    seen.update(["a", "b", "c"])
+    seen.update(["a", "d"])  # "a" est rafraîchi, "b" est le plus ancien
+    assert len(seen) == 3
+    assert "b" not in seen
+    assert all(entry_id in seen for entry_id in ("a", "c", "d"))
+
+def test_seen_entries_keep_every_entry_of_the_current_feed():
+    seen = SeenEntries(3)
+    seen.update(str(number) for number in range(10))
+    assert len(seen) == 10
+    assert all(str(number) in seen for number in range(10))
+
+def test_seen_entries_round_trip():
+    seen = SeenEntries(5)
+    seen.update(["a", "b", "c"])
+    restored = SeenEntries.from_list(5, seen.to_list())
+    assert restored.to_list() == seen.to_list()
+    assert "b" in restored and "z" not in restored
+
+def test_first_check_publishes_nothing(storage):
+    assert detect_new_entries(FEED_URL, make_feed(3, 2, 1)) == []
+    new_entries = detect_new_entries(FEED_URL, make_feed(5, 4, 3, 2, 1))
+    assert [entry.title for entry in new_entries] == ["Article 5", "Article 4"]
+
+def test_legacy_cursor_only_applies_to_its_guild(storage):
+    subscribe(storage, "1", 10, last_id="https://example.com/articles/2")
+    subscribe(storage, "2", 20)
+    assert collect_new_entries({FEED_URL: ["1", "2"]}, {FEED_URL: make_feed(4, 3, 2, 1)}) == {FEED_URL: []}
+    assert storage.rss_configs["1"]["pending_entries"] == {
+        FEED_URL: ["https://example.com/articles/3", "https://example.com/articles/4"]}
+    assert "pending_entries" not in storage.rss_configs["2"]
+
+def test_legacy_backlog_is_published_to_its_guild_only(delivery, storage):
+    subscribe(storage, "1", 10, last_id="https://example.com/articles/2")
+    subscribe(storage, "2", 20)
+    check(FakeBot(10, 20), delivery, make_feed(4, 3, 2, 1))
+    assert delivery.sent == [(10, "Article 3"), (10, "Article 4")]
+    assert "pending_entries" not in storage.rss_configs["1"]
+
+def test_missing_channel_receives_entries_when_it_comes_back(delivery, storage):
+    subscribe(storage, "1", 10)
+    subscribe(storage, "2", 20)
+    check(FakeBot(10, 20), delivery, make_feed(2, 1))
+
+    # Le canal du serveur 2 a disparu pendant la publication des articles 3 à 5
+    check(FakeBot(10), delivery, make_feed(5, 4, 3, 2, 1))
+    assert delivery.sent == [(10, "Article 3"), (10, "Article 4"), (10, "Article 5")]
+    assert delivery.forced == [False, False]
+
+    # Au retour du canal, le flux est reparsé même inchangé et le serveur 2 rattrape son retard
+    delivery.sent.clear()
+    check(FakeBot(10, 20), delivery, make_feed(6, 5, 4, 3, 2, 1))
+    assert delivery.forced[-1] is True
+    assert delivery.sent == [(10, "Article 6"), (20, "Article 3"), (20, "Article 4"), (20, "Article 5"), (20, "Article 6")]
+    assert "pending_entries" not in storage.rss_configs["2"]
+
+def test_pending_entries_are_persisted(delivery, storage):
+    subscribe(storage, "1", 10)
+    check(FakeBot(10), delivery, make_feed(1))
+    check(FakeBot(), delivery, make_feed(2, 1))
+
+    storage.save_config()  # Hors de la boucle d'événements: écriture immédiate
+    storage.rss_configs.clear()
+    storage.load_config()
+    assert storage.rss_configs["1"]["pending_entries"] == {FEED_URL: ["https://example.com/articles/2"]}
@@ -0,0 +1,98 @@
+import asyncio
+
+from config import (POLL_DEFAULT_INTERVAL, POLL_MAX_INTERVAL, FEED_CIRCUIT_THRESHOLD,
+                    FEED_CIRCUIT_OPEN_TIME, FEED_CIRCUIT_MAX_OPEN_TIME)
+from utils import poller
+from utils.scheduler import record_failure, record_success, is_paused, update_schedule, FeedScheduler
+
+FEED_URL = "https://example.com/rss"
+NOW = 1_700_000_000
+
+def fail(times, now=NOW):
+    return [record_failure(FEED_URL, "Timeout", now=now) for _ in range(times)]
+
+def test_failures_back_off_exponentially(storage):
+    fail(1)
+    assert storage.feed_schedules[FEED_URL]["interval"] == POLL_DEFAULT_INTERVAL * 2
+    fail(1)
+    assert storage.feed_schedules[FEED_URL]["interval"] == POLL_DEFAULT_INTERVAL * 4
+    assert storage.feed_schedules[FEED_URL]["next_due"] == NOW + POLL_DEFAULT_INTERVAL * 4
+    assert "state" not in storage.feed_schedules[FEED_URL]
+
+def test_backoff_is_capped(storage):
+    fail(FEED_CIRCUIT_THRESHOLD - 1)
+    assert storage.feed_schedules[FEED_URL]["interval"] <= POLL_MAX_INTERVAL
+
+def test_circuit_opens_at_threshold(storage):
+    opened = fail(FEED_CIRCUIT_THRESHOLD)
+    assert opened == [False] * (FEED_CIRCUIT_THRESHOLD - 1) + [True]
+    schedule = storage.feed_schedules[FEED_URL]
+    assert schedule["state"] == "open"
+    assert schedule["trips"] == 1
+    assert schedule["next_due"] == NOW + FEED_CIRCUIT_OPEN_TIME
+    assert is_paused(FEED_URL, NOW)
+    assert not is_paused(FEED_URL, NOW + FEED_CIRCUIT_OPEN_TIME)
+
+def test_failed_probe_doubles_the_pause_up_to_the_maximum(storage):
+    fail(FEED_CIRCUIT_THRESHOLD)
+    assert fail(1) == [False]  # Sonde en échec: le circuit était déjà ouvert
+    schedule = storage.feed_schedules[FEED_URL]
+    assert schedule["trips"] == 2
+    assert schedule["interval"] == FEED_CIRCUIT_OPEN_TIME * 2
+    fail(10)
+    assert schedule["interval"] == FEED_CIRCUIT_MAX_OPEN_TIME
+
+def test_success_closes_the_circuit(storage):
+    fail(FEED_CIRCUIT_THRESHOLD + 1)
+    assert record_success(FEED_URL) == FEED_CIRCUIT_THRESHOLD + 1
+    schedule = storage.feed_schedules[FEED_URL]
+    assert not {"failures", "trips", "state", "last_error"} & schedule.keys()
+    assert record_success(FEED_URL) == 0
+    # Le compteur repart de zéro: le prochain échec ne rouvre pas le circuit
+    assert fail(1) == [False]
+    assert "state" not in schedule
+
+def test_manual_check_skips_paused_feeds(storage, monkeypatch):
+    healthy_url = "https://example.org/rss"
+    fetched = []
+
+    async def fetch_feed(url, validators):
+        fetched.append(url)
+        raise ConnectionError("Connexion refusée")
+
+    monkeypatch.setattr(poller, "fetch_feed", fetch_feed)
+    fail(FEED_CIRCUIT_THRESHOLD, now=NOW * 2)  # Pause qui n'est pas encore terminée
+    paused = dict(storage.feed_schedules[FEED_URL])
+
+    feeds, stats = asyncio.run(poller.fetch_cycle({FEED_URL: ["1"], healthy_url: ["1"]}))
+    assert fetched == [healthy_url]
+    assert FEED_URL not in feeds
+    assert stats["paused"] == 1 and stats["errors"] == 1
+    assert storage.feed_schedules[FEED_URL] == paused
+
+def test_feed_removed_during_its_check_is_not_rescheduled(storage):
+    storage.rss_configs["1"] = {"channel": 10, "feeds": {FEED_URL: None}}
+
+    async def handler(url, guild_ids):
+        # removerss pendant la vérification, puis fin de la vérification
+        del storage.rss_configs["1"]["feeds"][url]
+        storage.forget_feed(url)
+        update_schedule(url)
+
+    async def run():
+        scheduler = FeedScheduler(workers=1)
+        scheduler._handler = handler
+        scheduler._queue = asyncio.Queue()
+        scheduler._wakeup = asyncio.Event()
+        scheduler._subscribers = {FEED_URL: ["1"]}
+        scheduler._running.add(FEED_URL)
+        await scheduler._queue.put((FEED_URL, NOW))
+        worker = asyncio.create_task(scheduler._worker())
+        while FEED_URL in scheduler._running:
+            await asyncio.sleep(0)
+        worker.cancel()
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert FEED_URL not in storage.feed_schedules
+    assert FEED_URL not in scheduler._scheduled
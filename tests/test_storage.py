@@ -0,0 +1,94 @@
+import os
+import json
+import asyncio
+import pytest
+
+FEED_URL = "https://example.com/rss"
+
+def configure(storage):
+    storage.rss_configs["1"] = {"channel": 10, "feeds": {FEED_URL: None}, "batch_embeds": True}
+    storage.server_keywords["1"] = ["IA", "santé"]
+    storage.log_channels["1"] = 11
+    storage.feed_validators[FEED_URL] = {"etag": '"abc"', "digest": "0123"}
+    storage.get_seen_entries(FEED_URL).update(["a", "b"])
+    storage.feed_schedules[FEED_URL] = {"interval": 300, "next_due": 1_700_000_000}
+
+def reload(storage):
+    for values in (storage.rss_configs, storage.server_keywords, storage.log_channels,
+                   storage.feed_validators, storage.seen_entries, storage.feed_schedules):
+        values.clear()
+    storage.load_config()
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_configuration_round_trip(storage, monkeypatch, backend):
+    monkeypatch.setattr(storage, "STORAGE_BACKEND", backend)
+    configure(storage)
+    storage.save_config()  # Hors de la boucle d'événements: écriture immédiate
+    reload(storage)
+
+    assert storage.rss_configs == {"1": {"channel": 10, "feeds": {FEED_URL: None}, "batch_embeds": True}}
+    assert storage.server_keywords == {"1": ["IA", "santé"]}
+    assert storage.log_channels == {"1": 11}
+    assert storage.feed_validators == {FEED_URL: {"etag": '"abc"', "digest": "0123"}}
+    assert "a" in storage.seen_entries[FEED_URL] and "c" not in storage.seen_entries[FEED_URL]
+    assert storage.feed_schedules == {FEED_URL: {"interval": 300, "next_due": 1_700_000_000}}
+
+def test_saves_are_debounced(storage, monkeypatch):
+    monkeypatch.setattr(storage, "SAVE_DELAY", 0.01)
+    monkeypatch.setattr(storage, "SAVE_DELAY_PER_FEED", 0)
+    writes = []
+    write_json = storage._write_json
+    monkeypatch.setattr(storage, "_write_json", lambda config_data: writes.append(config_data) or write_json(config_data))
+
+    async def run():
+        for guild_id in range(5):
+            storage.rss_configs[str(guild_id)] = {"channel": guild_id, "feeds": {}}
+            storage.save_config()
+        assert not writes  # Rien n'est écrit avant la fin du délai de regroupement
+        await storage._flush_task
+
+    asyncio.run(run())
+    assert len(writes) == 1
+    assert len(writes[0]["rss_configs"]) == 5
+    assert not storage._dirty
+
+def test_failed_write_keeps_previous_file(storage):
+    configure(storage)
+    storage.save_config()
+    with open(storage.CONFIG_FILE, encoding="utf-8") as f:
+        previous = f.read()
+
+    storage.log_channels["2"] = object()  # Non sérialisable: l'écriture échoue en cours de route
+    storage._dirty = True
+    asyncio.run(storage.flush_config())
+
+    with open(storage.CONFIG_FILE, encoding="utf-8") as f:
+        assert f.read() == previous
+    assert json.loads(previous)["log_channels"] == {"1": 11}
+    assert storage._dirty  # La sauvegarde sera retentée
+
+def test_snapshot_is_isolated_from_later_changes(storage):
+    configure(storage)
+    snapshot = storage._snapshot()
+    storage.rss_configs["1"]["feeds"]["https://example.org/rss"] = None
+    storage.get_seen_entries(FEED_URL).update(["c"])
+    storage.feed_schedules[FEED_URL]["interval"] = 600
+
+    storage._write_config(snapshot)
+    with open(storage.CONFIG_FILE, encoding="utf-8") as f:
+        written = json.load(f)
+    assert written["rss_configs"]["1"]["feeds"] == {FEED_URL: None}
+    assert len(written["seen_entries"][FEED_URL]) == 2
+    assert written["feed_schedules"][FEED_URL]["interval"] == 300
+    assert not os.path.exists(storage.CONFIG_FILE + ".tmp")
+
+def test_unchanged_seen_entries_are_serialized_once(storage):
+    configure(storage)
+    storage.get_seen_entries("https://example.org/rss").update(["x"])
+    first = storage._serialize(storage._snapshot())
+    storage.get_seen_entries(FEED_URL).update(["c"])
+    second = storage._serialize(storage._snapshot())
+
+    assert second["seen_entries"]["https://example.org/rss"] is first["seen_entries"]["https://example.org/rss"]
+    assert second["seen_entries"][FEED_URL] is not first["seen_entries"][FEED_URL]
+    assert len(second["seen_entries"][FEED_URL]) == 3
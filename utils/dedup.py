@@ -0,0 +1,226 @@
+import re
+import time
+import hashlib
+import logging
+import itertools
+from functools import lru_cache
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from config import DEDUP_TTL, DEDUP_MAX_ENTRIES, NEAR_DUPLICATE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Paramètres de suivi retirés des liens avant comparaison
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid",
+                   "ref", "ref_src", "ref_url", "cmpid", "xtor", "at_medium", "at_campaign", "_hsenc", "_hsmi"}
+TRACKING_PREFIXES = ("utm_", "at_", "pk_", "mtm_")
+
+# Nombre minimal de mots pour calculer une empreinte SimHash fiable
+MIN_FINGERPRINT_TOKENS = 8
+
+# Les mots d'une ou deux lettres (articles, prépositions) ne servent pas à l'empreinte
+_WORD = re.compile(r"\w{3,}")
+
+# Bits inversés au plus par bande lors d'une recherche de quasi-doublons
+MAX_BAND_FLIPS = 2
+
+# Index des articles récemment publiés par canal (liens et identifiants, puis empreintes)
+_indexes = {}
+_near_indexes = {}
+
+def canonical_url(url):
+    """Normalise un lien d'article pour comparer des copies d'une même page
+
+    Le schéma et l'hôte sont unifiés (https, minuscules, sans www. ni port
+    par défaut), le fragment, les paramètres de suivi et la barre oblique
+    finale sont retirés, et les paramètres restants sont triés.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return url.strip()
+
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+def _key(kind, value):
+    """Empreinte compacte d'une clé de déduplication"""
+    return hashlib.blake2b(f"{kind}:{value}".encode(), digest_size=8).digest()
+
+def entry_keys(entry):
+    """Clés de déduplication d'un article: lien canonique et identifiant (GUID)"""
+    keys = []
+    if entry.link:
+        keys.append(_key("url", canonical_url(entry.link)))
+    if entry.id and entry.id != entry.link:
+        keys.append(_key("id", entry.id))
+    return keys
+
+class RecentIndex:
+    """Ensemble de clés récentes, borné en durée (DEDUP_TTL) et en taille (DEDUP_MAX_ENTRIES)"""
+    __slots__ = ("ttl", "maxlen", "_keys")
+
+    def __init__(self, ttl=DEDUP_TTL, maxlen=DEDUP_MAX_ENTRIES):
+        self.ttl = ttl
+        self.maxlen = maxlen
+        self._keys = OrderedDict()  # {clé: instant d'ajout}, du plus ancien au plus récent
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _expire(self, now):
+        """Retire les clés trop anciennes ou en surnombre"""
+        while self._keys:
+            key, added = next(iter(self._keys.items()))
+            if now - added <= self.ttl and len(self._keys) <= self.maxlen:
+                break
+            del self._keys[key]
+
+    def check_and_add(self, keys):
+        """Indique si l'une des clés est déjà connue, et enregistre les clés sinon"""
+        now = time.monotonic()
+        self._expire(now)
+        if any(key in self._keys for key in keys):
+            return True
+        for key in keys:
+            self._keys[key] = now
+        self._expire(now)
+        return False
+
+def is_duplicate(channel_id, entry):
+    """Indique si un article a déjà été publié récemment dans le canal (sinon, l'enregistre)"""
+    keys = entry_keys(entry)
+    if not keys:
+        return False
+    if channel_id not in _indexes:
+        _indexes[channel_id] = RecentIndex()
+    return _indexes[channel_id].check_and_add(keys)
+
+def simhash(text):
+    """Empreinte SimHash (64 bits) d'un texte, None s'il est trop court
+
+    Deux textes proches ont des empreintes qui diffèrent de peu de bits.
+    Seuls les mots d'au moins trois lettres sont pris en compte: les mots
+    outils pèsent lourd dans un titre et un résumé courts sans distinguer
+    deux articles.
+    """
+    tokens = _WORD.findall(text.lower())
+    if len(tokens) < MIN_FINGERPRINT_TOKENS:
+        return None
+
+    weights = {}
+    for token in tokens:
+        weights[token] = weights.get(token, 0) + 1
+
+    counts = [0] * 64
+    for token, weight in weights.items():
+        value = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            if value >> bit & 1:
+                counts[bit] += weight
+            else:
+                counts[bit] -= weight
+
+    fingerprint = 0
+    for bit, count in enumerate(counts):
+        if count > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+@lru_cache(maxsize=None)
+def _flip_masks(width):
+    """Masques inversant au plus MAX_BAND_FLIPS bits d'une bande de `width` bits (0 compris)"""
+    return (0,) + tuple(sum(1 << bit for bit in bits)
+                        for count in range(1, MAX_BAND_FLIPS + 1)
+                        for bits in itertools.combinations(range(width), count))
+
+class NearDuplicateIndex:
+    """Index LSH d'empreintes SimHash récentes, borné en durée et en taille
+
+    Pour une distance de Hamming maximale d, les 64 bits sont découpés en
+    d // (MAX_BAND_FLIPS + 1) + 1 bandes: deux empreintes à distance <= d ont
+    au moins une bande qui diffère d'au plus MAX_BAND_FLIPS bits. Chaque bande
+    est donc cherchée telle quelle et avec jusqu'à MAX_BAND_FLIPS bits
+    inversés, et seules les empreintes trouvées ainsi sont comparées.
+    """
+    __slots__ = ("max_distance", "ttl", "maxlen", "_bands", "_buckets", "_fingerprints")
+
+    def __init__(self, threshold, ttl=DEDUP_TTL, maxlen=DEDUP_MAX_ENTRIES):
+        self.max_distance = int(64 * (1 - threshold))
+        self.ttl = ttl
+        self.maxlen = maxlen
+        # Bandes (décalage, masque, masques d'inversion) de tailles aussi égales que possible
+        count = self.max_distance // (MAX_BAND_FLIPS + 1) + 1
+        self._bands = []
+        start = 0
+        for band in range(count):
+            width = 64 // count + (1 if band < 64 % count else 0)
+            self._bands.append((start, (1 << width) - 1, _flip_masks(width)))
+            start += width
+        self._buckets = [{} for _ in self._bands]  # Par bande: {valeur de la bande: {empreinte}}
+        self._fingerprints = OrderedDict()  # {empreinte: instant d'ajout}
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def _band_values(self, fingerprint):
+        return [fingerprint >> start & mask for start, mask, flips in self._bands]
+
+    def _expire(self, now):
+        """Retire les empreintes trop anciennes ou en surnombre"""
+        while self._fingerprints:
+            fingerprint, added = next(iter(self._fingerprints.items()))
+            if now - added <= self.ttl and len(self._fingerprints) <= self.maxlen:
+                break
+            del self._fingerprints[fingerprint]
+            for buckets, value in zip(self._buckets, self._band_values(fingerprint)):
+                bucket = buckets[value]
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del buckets[value]
+
+    def check_and_add(self, fingerprint):
+        """Indique si une empreinte proche est déjà connue, et enregistre l'empreinte sinon"""
+        now = time.monotonic()
+        self._expire(now)
+        values = self._band_values(fingerprint)
+        for buckets, value, (start, mask, flips) in zip(self._buckets, values, self._bands):
+            for flip in flips:
+                candidates = buckets.get(value ^ flip)
+                if candidates:
+                    for candidate in candidates:
+                        if bin(candidate ^ fingerprint).count("1") <= self.max_distance:
+                            return True
+
+        self._fingerprints.pop(fingerprint, None)
+        self._fingerprints[fingerprint] = now
+        for buckets, value in zip(self._buckets, values):
+            buckets.setdefault(value, set()).add(fingerprint)
+        self._expire(now)
+        return False
+
+def is_near_duplicate(channel_id, entry):
+    """Indique si un article très proche (titre et résumé) a été publié récemment dans le canal
+
+    Sinon, l'empreinte de l'article est enregistrée. Toujours faux si
+    NEAR_DUPLICATE_THRESHOLD vaut None.
+    """
+    if NEAR_DUPLICATE_THRESHOLD is None:
+        return False
+    fingerprint = simhash(f"{entry.title} {entry.description}")
+    if fingerprint is None:
+        return False
+    if channel_id not in _near_indexes:
+        _near_indexes[channel_id] = NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD)
+    return _near_indexes[channel_id].check_and_add(fingerprint)
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import time
+from collections import deque
+import aiohttp
+import discord
+from config import (DELIVERY_WORKERS, DELIVERY_CHANNEL_RATE, DELIVERY_CHANNEL_PERIOD,
+                    DELIVERY_GLOBAL_RATE, DELIVERY_MAX_RETRIES, DELIVERY_BACKOFF,
+                    DELIVERY_WEBHOOK_NAME, DELIVERY_WEBHOOK_RETRY)
+from utils.metrics import Counter, Histogram, Gauge
+
+logger = logging.getLogger(__name__)
+
+SEND_DURATION = Histogram("rss_send_duration_seconds", "Durée de l'envoi d'un message d'articles à Discord")
+RATE_LIMITED = Counter("rss_discord_rate_limited_total", "Réponses 429 (limite de débit) de Discord")
+
+# Limites Discord pour un message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+class TokenBucket:
+    """Seau à jetons: au plus `rate` envois par période de `period` secondes"""
+    __slots__ = ("rate", "period", "tokens", "updated")
+
+    def __init__(self, rate, period):
+        self.rate = rate
+        self.period = period
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        """Ajoute les jetons accumulés depuis la dernière mise à jour"""
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.period)
+        self.updated = now
+
+    def reserve(self):
+        """Réserve un jeton et retourne le délai d'attente (en secondes) avant de l'utiliser"""
+        self._refill()
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0
+        return -self.tokens * self.period / self.rate
+
+    def pause(self, seconds):
+        """Bloque le seau pendant `seconds` secondes (après un 429)"""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate / self.period
+
+class DeliveryQueue:
+    """File d'envoi des articles, découplée de la vérification des flux
+
+    Chaque canal a sa propre file (l'ordre chronologique y est conservé) et
+    n'est traité que par un worker à la fois. Les envois sont cadencés par un
+    seau à jetons par canal et un seau global, et réessayés avec un délai
+    croissant en cas de 429 ou d'erreur serveur.
+
+    En mode webhook, les articles sont postés via un webhook du canal avec une
+    session HTTP dédiée: chaque webhook a sa propre limite de débit et le seau
+    global du bot reste libre pour les commandes.
+    """
+
+    def __init__(self, workers=DELIVERY_WORKERS):
+        self.workers = workers
+        self._queues = {}  # {channel_id: deque d'embeds en attente}
+        self._channels = {}  # {channel_id: canal Discord}
+        self._batching = {}  # {channel_id: regrouper les embeds par message}
+        self._use_webhook = {}  # {channel_id: envoyer via un webhook}
+        self._webhooks = {}  # {channel_id: Webhook}
+        self._webhook_denied = {}  # {channel_id: instant du prochain essai de création après un refus}
+        self._session = None  # Session HTTP des webhooks (créée à la demande)
+        self._buckets = {}  # {channel_id: TokenBucket}
+        self._global_bucket = TokenBucket(DELIVERY_GLOBAL_RATE, 1)
+        self._ready = asyncio.Queue()  # canaux ayant des embeds à envoyer
+        self._tasks = []
+
+    @property
+    def depth(self):
+        """Nombre total d'embeds en attente d'envoi"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def start(self):
+        """Démarre les workers d'envoi (sans effet s'ils tournent déjà)"""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"File d'envoi démarrée avec {self.workers} workers")
+
+    async def stop(self, timeout=10):
+        """Attend (au plus `timeout` secondes) que les files se vident puis arrête les workers"""
+        deadline = time.monotonic() + timeout
+        while self._queues and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._queues:
+            logger.warning(f"File d'envoi arrêtée avec {self.depth} embeds non envoyés")
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def enqueue(self, channel, embed, batch=False, webhook=False):
+        """Ajoute un embed à la file du canal, sans attendre son envoi
+
+        Avec `batch`, les embeds en attente du canal sont regroupés par
+        messages de MAX_EMBEDS_PER_MESSAGE au plus. Avec `webhook`, ils sont
+        envoyés via un webhook du canal (ou channel.send à défaut).
+        """
+        self._channels[channel.id] = channel
+        self._batching[channel.id] = batch
+        self._use_webhook[channel.id] = webhook
+        if channel.id in self._queues:
+            # Canal déjà en attente ou en cours de traitement par un worker
+            self._queues[channel.id].append(embed)
+        else:
+            self._queues[channel.id] = deque([embed])
+            self._ready.put_nowait(channel.id)
+
+    def _get_bucket(self, channel_id):
+        """Retourne le seau à jetons d'un canal"""
+        if channel_id not in self._buckets:
+            self._buckets[channel_id] = TokenBucket(DELIVERY_CHANNEL_RATE, DELIVERY_CHANNEL_PERIOD)
+        return self._buckets[channel_id]
+
+    def _get_session(self):
+        """Retourne la session HTTP partagée par les webhooks"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    def forget_webhook(self, channel_id):
+        """Oublie le webhook d'un canal (ou son refus), pour le recréer au prochain envoi"""
+        self._webhooks.pop(channel_id, None)
+        self._webhook_denied.pop(channel_id, None)
+
+    async def _get_webhook(self, channel):
+        """Retourne le webhook d'envoi du canal (None si le bot ne peut pas en créer)
+
+        Un refus (permission « Gérer les webhooks » manquante) est mémorisé
+        DELIVERY_WEBHOOK_RETRY secondes, pour ne pas redemander à chaque envoi
+        tout en reprenant le mode webhook une fois la permission accordée.
+        """
+        if channel.id in self._webhooks:
+            return self._webhooks[channel.id]
+        if time.monotonic() < self._webhook_denied.get(channel.id, 0):
+            return None
+
+        webhook = None
+        try:
+            # Réutiliser le webhook créé lors d'un précédent démarrage
+            for existing in await channel.webhooks():
+                if existing.name == DELIVERY_WEBHOOK_NAME and existing.token:
+                    webhook = existing
+                    break
+            if webhook is None:
+                webhook = await channel.create_webhook(name=DELIVERY_WEBHOOK_NAME, reason="Publication des flux RSS")
+            # Rattacher le webhook à la session dédiée plutôt qu'à celle du bot
+            webhook = discord.Webhook.from_url(webhook.url, session=self._get_session())
+            logger.info(f"Webhook d'envoi prêt pour le canal {channel.id}")
+        except discord.Forbidden:
+            logger.warning(f"Création de webhook non autorisée dans le canal {channel.id}, envoi classique utilisé "
+                           f"(nouvel essai dans {DELIVERY_WEBHOOK_RETRY}s)")
+            self._webhook_denied[channel.id] = time.monotonic() + DELIVERY_WEBHOOK_RETRY
+            return None
+        except discord.HTTPException as e:
+            # Erreur passagère: réessayer au prochain envoi
+            logger.error(f"Erreur lors de la préparation du webhook du canal {channel.id}: {e}")
+            return None
+
+        self._webhooks[channel.id] = webhook
+        return webhook
+
+    def _next_message(self, channel_id):
+        """Retire de la file du canal les embeds du prochain message"""
+        queue = self._queues[channel_id]
+        embeds = [queue.popleft()]
+        if self._batching.get(channel_id):
+            size = len(embeds[0])
+            while queue and len(embeds) < MAX_EMBEDS_PER_MESSAGE and size + len(queue[0]) <= MAX_EMBED_CHARS_PER_MESSAGE:
+                size += len(queue[0])
+                embeds.append(queue.popleft())
+        return embeds
+
+    async def _worker(self):
+        """Envoie les embeds des canaux prêts, un message par tour pour rester équitable"""
+        while True:
+            channel_id = await self._ready.get()
+            queue = self._queues[channel_id]
+            try:
+                embeds = self._next_message(channel_id)
+                await self._send(self._channels[channel_id], embeds)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'envoi d'un article: {e}")
+            finally:
+                if queue:
+                    self._ready.put_nowait(channel_id)
+                else:
+                    del self._queues[channel_id]
+
+    async def _send(self, channel, embeds):
+        """Envoie un message d'un ou plusieurs embeds en respectant les limites de débit, avec réessais"""
+        bucket = self._get_bucket(channel.id)
+        for attempt in range(DELIVERY_MAX_RETRIES + 1):
+            webhook = await self._get_webhook(channel) if self._use_webhook.get(channel.id) else None
+            await asyncio.sleep(bucket.reserve())
+            if webhook is None:
+                # Les webhooks ne consomment pas la limite globale du bot
+                await asyncio.sleep(self._global_bucket.reserve())
+            try:
+                with SEND_DURATION.time():
+                    if webhook is not None:
+                        me = channel.guild.me
+                        await webhook.send(embeds=embeds, username=me.display_name, avatar_url=me.display_avatar.url)
+                    else:
+                        await channel.send(embeds=embeds)
+                for embed in embeds:
+                    logger.info(f"Nouvel article envoyé: {embed.title}")
+                return
+            except discord.RateLimited as e:
+                RATE_LIMITED.inc()
+                delay = e.retry_after
+            except discord.NotFound as e:
+                if webhook is None:
+                    logger.error(f"Envoi impossible dans le canal {channel.id}: {e}")
+                    return
+                # Webhook supprimé entre-temps: en recréer un au prochain essai
+                logger.warning(f"Webhook du canal {channel.id} introuvable, il sera recréé")
+                self._webhooks.pop(channel.id, None)
+                continue
+            except discord.HTTPException as e:
+                if e.status == 400 and len(embeds) > 1:
+                    # Un des embeds regroupés est invalide: les envoyer un par un
+                    # pour ne perdre que l'article fautif
+                    logger.warning(f"Message de {len(embeds)} articles refusé dans le canal {channel.id}, envoi article par article: {e}")
+                    for embed in embeds:
+                        await self._send(channel, [embed])
+                    return
+                if e.status != 429 and e.status < 500:
+                    # Erreur définitive (permissions, canal supprimé...)
+                    logger.error(f"Envoi impossible dans le canal {channel.id}: {e}")
+                    return
+                if e.status == 429:
+                    RATE_LIMITED.inc()
+                delay = DELIVERY_BACKOFF * 2 ** attempt
+
+            logger.warning(f"Envoi limité dans le canal {channel.id}, nouvel essai dans {delay:.1f}s")
+            bucket.pause(delay)
+
+        logger.error(f"{len(embeds)} article(s) abandonné(s) après {DELIVERY_MAX_RETRIES} réessais dans le canal {channel.id}")
+
+# File d'envoi partagée
+delivery_queue = DeliveryQueue()
+Gauge("rss_delivery_queue_depth", "Embeds d'articles en attente d'envoi", lambda: delivery_queue.depth)
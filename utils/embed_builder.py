@@ -1,64 +1,71 @@
 import discord
 from datetime import datetime
 from config import DATE_FORMAT
-from utils.rss_parser import get_color_for_url, get_feed_image, get_entry_image, get_entry_categories, parse_date, clean_html
+from utils.rss_parser import get_color_for_url
+
+# Limites de Discord pour les champs d'un embed (en caractères)
+MAX_TITLE = 256
+MAX_DESCRIPTION = 4096
+MAX_AUTHOR_NAME = 256
+MAX_FIELD_VALUE = 1024
+MAX_FOOTER = 2048
+MAX_EMBED_TOTAL = 6000
+
+def _clamp(text, limit):
+    """Tronque un texte à `limit` caractères (points de suspension compris)"""
+    if text and len(text) > limit:
+        return text[:limit - 3] + "..."
+    return text
 
 def create_article_embed(entry, feed, rss_url):
-    """Crée un embed pour un article RSS"""
+    """Crée un embed pour un article RSS (Entry) de son flux (FeedMeta)
+
+    Les textes sont tronqués aux limites de Discord pour qu'un article trop
+    long ne fasse pas rejeter le message (et les autres articles regroupés).
+    """
     # Obtenir la date de publication
-    pub_date = parse_date(entry)
+    pub_date = entry.published
     
     # Obtenir le titre du flux
-    feed_title = feed.feed.title if hasattr(feed.feed, 'title') else "Flux RSS"
-    
-    # Obtenir la description/résumé
-    description = ""
-    if hasattr(entry, 'summary'):
-        description = clean_html(entry.summary)
-    elif hasattr(entry, 'description'):
-        description = clean_html(entry.description)
-    
-    # Limiter la longueur de la description
-    if len(description) > 300:
-        description = description[:300] + "..."
+    feed_title = _clamp(feed.title or "Flux RSS", MAX_AUTHOR_NAME)
     
     # Créer un embed moderne pour l'article
     embed = discord.Embed(
-        title=entry.title,
+        title=_clamp(entry.title, MAX_TITLE),
         url=entry.link,
-        description=description,
+        description=_clamp(entry.description, MAX_DESCRIPTION),
         color=get_color_for_url(rss_url),
         timestamp=pub_date
     )
     
     # Ajouter l'image du flux si disponible
-    feed_icon = get_feed_image(feed.feed)
-    if feed_icon:
-        embed.set_author(name=feed_title, 
-                        url=feed.feed.link if hasattr(feed.feed, 'link') else None,
-                        icon_url=feed_icon)
+    if feed.image:
+        embed.set_author(name=feed_title, url=feed.link, icon_url=feed.image)
     else:
-        embed.set_author(name=feed_title, 
-                        url=feed.feed.link if hasattr(feed.feed, 'link') else None)
+        embed.set_author(name=feed_title, url=feed.link)
     
     # Ajouter l'image de l'article si disponible
-    image_url = get_entry_image(entry)
-    if image_url:
-        embed.set_image(url=image_url)
+    if entry.image:
+        embed.set_image(url=entry.image)
     
     # Ajouter l'auteur si disponible
-    if hasattr(entry, 'author'):
-        embed.add_field(name="✍️ Auteur", value=entry.author, inline=True)
+    if entry.author:
+        embed.add_field(name="✍️ Auteur", value=_clamp(entry.author, MAX_FIELD_VALUE), inline=True)
     
     # Ajouter les catégories si disponibles
-    categories = get_entry_categories(entry)
+    categories = entry.categories
     if categories:
-        embed.add_field(name="🏷️ Catégories", value=", ".join(categories[:5]) + 
-                      ("..." if len(categories) > 5 else ""), inline=True)
+        embed.add_field(name="🏷️ Catégories", value=_clamp(", ".join(categories[:5]) +
+                      ("..." if len(categories) > 5 else ""), MAX_FIELD_VALUE), inline=True)
     
     # Ajouter un pied de page
     formatted_date = pub_date.strftime(DATE_FORMAT)
     embed.set_footer(text=f"Publié le {formatted_date}")
+
+    # Respecter la limite totale en raccourcissant la description
+    excess = len(embed) - MAX_EMBED_TOTAL
+    if excess > 0 and embed.description:
+        embed.description = _clamp(embed.description, max(len(embed.description) - excess, 3))
     
     return embed
 
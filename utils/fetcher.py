@@ -0,0 +1,265 @@
+import time
+import asyncio
+import logging
+import aiohttp
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ProcessPoolExecutor
+from config import (FETCH_CONCURRENCY, FETCH_TIMEOUT, USER_AGENT, PARSE_WORKERS, PARSE_POOL_MIN_SIZE,
+                    FETCH_HOST_CONCURRENCY, FETCH_HOST_SPACING, FETCH_MAX_RETRY_AFTER,
+                    FETCH_CONNECT_TIMEOUT, FETCH_READ_TIMEOUT, FETCH_MAX_BYTES)
+from utils.rss_parser import parse_feed_content
+from utils.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+FETCH_DURATION = Histogram("rss_fetch_duration_seconds", "Durée du téléchargement d'un flux")
+FETCH_BYTES = Counter("rss_fetch_bytes_total", "Octets de flux téléchargés")
+FETCH_RESPONSES = Counter("rss_fetch_responses_total", "Téléchargements de flux par résultat", labels=("result",))
+PARSE_DURATION = Histogram("rss_parse_duration_seconds", "Durée du parsing d'un flux (thread ou pool de processus)")
+
+# Session HTTP partagée, limite globale de concurrence et pool de parsing (créés à la demande)
+_session = None
+_semaphore = None
+_executor = None
+_hosts = {}  # {hôte: HostLimiter}
+fetch_stats = {}  # {url: FetchStats}
+
+# Taille des blocs lus lors du téléchargement d'un flux
+CHUNK_SIZE = 64 * 1024
+
+class FeedTooLarge(Exception):
+    """Le flux dépasse la taille maximale autorisée (FETCH_MAX_BYTES)"""
+
+class HostThrottled(Exception):
+    """L'hôte a demandé (Retry-After) de ne pas être sollicité avant un certain temps"""
+
+class HostLimiter:
+    """Règles de politesse envers un hôte: concurrence, espacement minimal et Retry-After"""
+    __slots__ = ("host", "semaphore", "next_start", "blocked_until")
+
+    def __init__(self, host):
+        self.host = host
+        self.semaphore = asyncio.Semaphore(FETCH_HOST_CONCURRENCY)
+        self.next_start = 0  # Instant (time.monotonic) de la prochaine requête autorisée
+        self.blocked_until = 0  # Fin de la pause demandée par l'hôte
+
+    async def wait(self):
+        """Attend le créneau de la prochaine requête vers l'hôte"""
+        now = time.monotonic()
+        if self.blocked_until - now > FETCH_TIMEOUT:
+            # Ne pas immobiliser un worker: le flux sera vérifié plus tard
+            raise HostThrottled(f"{self.host} limité pendant encore {self.blocked_until - now:.0f}s")
+        start = max(now, self.next_start, self.blocked_until)
+        self.next_start = start + FETCH_HOST_SPACING
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def retry_after(self, value):
+        """Suspend l'hôte selon l'en-tête Retry-After (secondes ou date HTTP)"""
+        try:
+            delay = float(value)
+        except (TypeError, ValueError):
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return
+        delay = min(max(delay, 0), FETCH_MAX_RETRY_AFTER)
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        logger.warning(f"Hôte {self.host} limité: pause de {delay:.0f}s demandée")
+
+class FetchStats:
+    """Statistiques de téléchargement d'un flux (durées en secondes, tailles en octets)"""
+    __slots__ = ("requests", "timeouts", "oversized", "total_duration", "last_duration", "last_size", "max_size")
+
+    def __init__(self):
+        self.requests = 0
+        self.timeouts = 0
+        self.oversized = 0
+        self.total_duration = 0
+        self.last_duration = 0
+        self.last_size = 0
+        self.max_size = 0
+
+    @property
+    def average_duration(self):
+        return self.total_duration / self.requests if self.requests else 0
+
+    def record(self, duration, size):
+        """Enregistre un téléchargement terminé (taille None pour une réponse 304)"""
+        self.requests += 1
+        self.total_duration += duration
+        self.last_duration = duration
+        if size is not None:
+            self.last_size = size
+            self.max_size = max(self.max_size, size)
+
+class FetchResult:
+    """Résultat du téléchargement d'un flux RSS"""
+    __slots__ = ("url", "status", "content", "headers")  # headers: noms en minuscules
+
+    def __init__(self, url, status, content, headers):
+        self.url = url
+        self.status = status
+        self.content = content
+        self.headers = headers
+
+def _lower_headers(response):
+    """Retourne les en-têtes d'une réponse avec des noms en minuscules"""
+    return {name.lower(): value for name, value in response.headers.items()}
+
+def _get_semaphore():
+    """Retourne le sémaphore limitant les téléchargements simultanés"""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+    return _semaphore
+
+def _get_host_limiter(url):
+    """Retourne les règles de politesse de l'hôte d'une URL"""
+    host = (urlsplit(url).hostname or "").lower()
+    if host not in _hosts:
+        _hosts[host] = HostLimiter(host)
+    return _hosts[host]
+
+async def get_session():
+    """Retourne la session HTTP partagée, en la créant si nécessaire
+
+    Les connexions keep-alive sont réutilisées par hôte (HTTP/1.1).
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=FETCH_CONCURRENCY,
+            limit_per_host=FETCH_HOST_CONCURRENCY,
+            keepalive_timeout=60,
+            ttl_dns_cache=300
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT, connect=FETCH_CONNECT_TIMEOUT,
+                                          sock_read=FETCH_READ_TIMEOUT),
+            headers={"User-Agent": USER_AGENT}
+        )
+    return _session
+
+async def close_session():
+    """Ferme la session HTTP partagée"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+async def fetch_feed(url, validators=None):
+    """Télécharge le contenu brut d'un flux RSS
+
+    Si des validateurs ({"etag": ..., "last_modified": ...}) sont fournis, la
+    requête est conditionnelle et un statut 304 est retourné sans contenu.
+    Les requêtes vers un même hôte sont limitées et espacées, et suspendues
+    lorsque l'hôte répond 429/503 avec Retry-After. Le corps est lu par blocs
+    et le téléchargement est abandonné au-delà de FETCH_MAX_BYTES octets ou
+    des délais de connexion, de lecture et total.
+    """
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    limiter = _get_host_limiter(url)
+    stats = fetch_stats.setdefault(url, FetchStats())
+    async with limiter.semaphore:
+        await limiter.wait()
+        async with _get_semaphore():
+            session = await get_session()
+            started = time.monotonic()
+            try:
+                async with session.get(url, headers=headers) as response:
+                    if response.status in (429, 503) and "Retry-After" in response.headers:
+                        limiter.retry_after(response.headers["Retry-After"])
+                    if response.status == 304:
+                        _record_fetch(stats, started, None, "not_modified")
+                        return FetchResult(url, response.status, None, _lower_headers(response))
+                    response.raise_for_status()
+                    content = await _read_body(response)
+                    _record_fetch(stats, started, len(content), "ok")
+                    return FetchResult(url, response.status, content, _lower_headers(response))
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                FETCH_RESPONSES.inc(result="timeout")
+                raise
+            except FeedTooLarge:
+                stats.oversized += 1
+                FETCH_RESPONSES.inc(result="too_large")
+                raise
+            except aiohttp.ClientError:
+                FETCH_RESPONSES.inc(result="error")
+                raise
+
+def _record_fetch(stats, started, size, result):
+    """Enregistre les statistiques et métriques d'un téléchargement terminé"""
+    duration = time.monotonic() - started
+    stats.record(duration, size)
+    FETCH_DURATION.observe(duration)
+    FETCH_RESPONSES.inc(result=result)
+    if size is not None:
+        FETCH_BYTES.inc(size)
+
+async def _read_body(response):
+    """Lit le corps d'une réponse par blocs en s'arrêtant au-delà de FETCH_MAX_BYTES"""
+    if response.content_length is not None and response.content_length > FETCH_MAX_BYTES:
+        raise FeedTooLarge(f"Flux trop volumineux ({response.content_length} octets annoncés)")
+
+    chunks = []
+    size = 0
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        size += len(chunk)
+        if size > FETCH_MAX_BYTES:
+            raise FeedTooLarge(f"Flux trop volumineux (plus de {FETCH_MAX_BYTES} octets)")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def get_validators(result):
+    """Extrait les validateurs HTTP (ETag/Last-Modified) d'une réponse"""
+    validators = {}
+    if "etag" in result.headers:
+        validators["etag"] = result.headers["etag"]
+    if "last-modified" in result.headers:
+        validators["last_modified"] = result.headers["last-modified"]
+    return validators
+
+def _get_executor():
+    """Retourne le pool de processus de parsing (None s'il est désactivé)"""
+    global _executor
+    if _executor is None and PARSE_WORKERS > 0:
+        _executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _executor
+
+def shutdown_parse_pool():
+    """Arrête le pool de processus de parsing"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+    _executor = None
+
+async def parse_feed(result):
+    """Parse le contenu d'un flux hors de la boucle d'événements et retourne son résumé
+
+    Les gros flux sont envoyés au pool de processus (si PARSE_WORKERS > 0),
+    les autres sont parsés dans un thread.
+    """
+    headers = dict(result.headers)
+    headers.setdefault("content-location", result.url)
+
+    executor = _get_executor()
+    with PARSE_DURATION.time():
+        if executor is not None and len(result.content) >= PARSE_POOL_MIN_SIZE:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, parse_feed_content, result.content, headers)
+        return await asyncio.to_thread(parse_feed_content, result.content, headers)
+
+async def fetch_and_parse(url):
+    """Télécharge puis parse un flux RSS et retourne son résumé"""
+    result = await fetch_feed(url)
+    return await parse_feed(result)
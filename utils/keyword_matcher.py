@@ -0,0 +1,78 @@
+import logging
+
+try:
+    import ahocorasick  # pyahocorasick (requirements.txt): automate d'Aho-Corasick en C
+except ImportError:
+    ahocorasick = None  # Repli plus lent: une recherche par mot-clé
+
+logger = logging.getLogger(__name__)
+
+# Matchers compilés par serveur (invalidés par les commandes de mots-clés)
+_matchers = {}
+
+class KeywordMatcher:
+    """Recherche insensible à la casse d'une liste de mots-clés, compilée une seule fois
+
+    Avec pyahocorasick (installé par requirements.txt), le texte est parcouru
+    en une seule passe par un automate d'Aho-Corasick. S'il est absent, les
+    motifs pré-normalisés sont recherchés un par un avec l'opérateur `in`
+    (en C), ce qui reste plus rapide en CPython qu'un automate écrit en
+    Python pur mais coûte une passe par mot-clé.
+    """
+    __slots__ = ("_patterns", "_minimal", "_automaton")
+
+    def __init__(self, keywords):
+        # {mot-clé en minuscules: mot-clé d'origine}
+        self._patterns = {}
+        for keyword in keywords:
+            self._patterns.setdefault(keyword.lower(), keyword)
+
+        # Pour savoir si au moins un mot-clé est présent, il suffit de chercher
+        # les motifs qui n'en contiennent aucun autre
+        self._minimal = [
+            pattern for pattern in self._patterns
+            if not any(other != pattern and other in pattern for other in self._patterns)
+        ]
+
+        self._automaton = None
+        if ahocorasick is not None and self._patterns:
+            self._automaton = ahocorasick.Automaton()
+            for pattern, keyword in self._patterns.items():
+                self._automaton.add_word(pattern, keyword)
+            self._automaton.make_automaton()
+
+    def __bool__(self):
+        return bool(self._patterns)
+
+    def matches(self, text):
+        """Indique si le texte (déjà en minuscules) contient au moins un mot-clé"""
+        if self._automaton is not None:
+            for _ in self._automaton.iter(text):
+                return True
+            return False
+        return any(pattern in text for pattern in self._minimal)
+
+    def find(self, text):
+        """Retourne les mots-clés présents dans le texte (déjà en minuscules)"""
+        if self._automaton is not None:
+            hits = {}
+            for _, keyword in self._automaton.iter(text):
+                hits[keyword] = None
+            return list(hits)
+        return [keyword for pattern, keyword in self._patterns.items() if pattern in text]
+
+def get_keyword_matcher(guild_id):
+    """Retourne le matcher compilé des mots-clés d'un serveur (None si aucun mot-clé)"""
+    # Import local: les processus de parsing importent ce module sans avoir besoin du stockage
+    from utils.storage import server_keywords
+
+    guild_id = str(guild_id)
+    if guild_id not in _matchers:
+        keywords = server_keywords.get(guild_id, [])
+        _matchers[guild_id] = KeywordMatcher(keywords) if keywords else None
+        logger.debug(f"Mots-clés compilés pour le serveur {guild_id}: {len(keywords)}")
+    return _matchers[guild_id]
+
+def invalidate_keyword_matcher(guild_id):
+    """Force la recompilation des mots-clés d'un serveur après une modification"""
+    _matchers.pop(str(guild_id), None)
@@ -1,12 +1,195 @@
+import asyncio
 import discord
 import logging
 from datetime import datetime
 from utils.storage import log_channels
+from config import LOG_FLUSH_INTERVAL, LOG_MAX_EVENTS, LOG_MAX_MESSAGES
+from utils.metrics import Gauge
 
 logger = logging.getLogger(__name__)
 
+# Limites Discord pour un champ et pour un embed
+MAX_FIELD_VALUE = 1024
+MAX_EMBED_CHARS = 6000
+
+class LogEvent:
+    """Événement de log en attente, éventuellement fusionné avec ses répétitions"""
+    __slots__ = ("title", "message", "color", "time", "count")
+
+    def __init__(self, title, message, color):
+        self.title = title
+        self.message = message
+        self.color = color
+        self.time = datetime.now()
+        self.count = 1
+
+    @property
+    def is_error(self):
+        return self.color == discord.Color.red()
+
+class LogSink:
+    """Tampon des logs envoyés dans les canaux de logs
+
+    Les événements sont regroupés par serveur pendant LOG_FLUSH_INTERVAL
+    secondes puis envoyés en un seul embed (un champ par événement). Les
+    événements identiques sont fusionnés avec un compteur. Au-delà de
+    LOG_MAX_EVENTS événements en attente pour un serveur, les nouveaux
+    événements sont ignorés (sauf les erreurs, qui remplacent le plus ancien
+    événement non critique), et au plus LOG_MAX_MESSAGES messages partent par
+    période: les serveurs restants attendent la période suivante. Les
+    événements d'un envoi en échec sont remis en attente, dans les mêmes
+    limites.
+    """
+
+    def __init__(self):
+        self._bot = None
+        self._events = {}  # {guild_id: [LogEvent]} dans l'ordre d'arrivée
+        self._dropped = {}  # {guild_id: nombre d'événements ignorés}
+        self._task = None
+
+    @property
+    def depth(self):
+        """Nombre d'événements en attente d'envoi"""
+        return sum(len(events) for events in self._events.values())
+
+    def start(self):
+        """Démarre l'envoi périodique des logs (sans effet s'il tourne déjà)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Arrête l'envoi périodique et envoie les logs en attente"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush(limit=None)
+
+    def add(self, bot, guild_id, message, color, title):
+        """Met un événement en attente pour le canal de logs d'un serveur"""
+        self._bot = bot
+        self._insert(guild_id, LogEvent(title, message, color))
+
+    def _insert(self, guild_id, event):
+        """Ajoute un événement aux événements en attente d'un serveur, en fusionnant les répétitions"""
+        events = self._events.setdefault(guild_id, [])
+
+        # Fusionner avec un événement identique déjà en attente
+        for old in events:
+            if old.title == event.title and old.message == event.message:
+                old.count += event.count
+                old.time = max(old.time, event.time)
+                return
+
+        if len(events) >= LOG_MAX_EVENTS:
+            # Tampon plein: privilégier les erreurs au détriment des autres événements
+            victim = next((i for i, old in enumerate(events) if not old.is_error), None)
+            if not event.is_error or victim is None:
+                self._dropped[guild_id] = self._dropped.get(guild_id, 0) + 1
+                return
+            del events[victim]
+            self._dropped[guild_id] = self._dropped.get(guild_id, 0) + 1
+        events.append(event)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(LOG_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Erreur lors de l'envoi des logs: {e}")
+
+    async def flush(self, limit=LOG_MAX_MESSAGES):
+        """Envoie un embed récapitulatif par serveur ayant des logs en attente"""
+        sent = 0
+        for guild_id in list(self._events):
+            if limit is not None and sent >= limit:
+                logger.debug(f"Logs reportés pour {len(self._events)} serveurs")
+                break
+            events = self._events.pop(guild_id)
+            dropped = self._dropped.pop(guild_id, 0)
+            if guild_id not in log_channels:
+                continue  # Canal de logs retiré entre-temps: plus de destination
+            if await self._send(guild_id, events, dropped):
+                sent += 1
+            else:
+                self._requeue(guild_id, events, dropped)
+
+    def _requeue(self, guild_id, events, dropped):
+        """Remet en attente les événements d'un envoi en échec, avant ceux arrivés entre-temps"""
+        newer = self._events.pop(guild_id, [])
+        self._dropped[guild_id] = self._dropped.get(guild_id, 0) + dropped
+        for event in events + newer:
+            self._insert(guild_id, event)
+
+    async def _send(self, guild_id, events, dropped):
+        """Envoie les événements d'un serveur dans son canal de logs (retourne False en cas d'échec)"""
+        if self._bot is None:
+            return False
+
+        channel_id = log_channels[guild_id]
+        channel = self._bot.get_channel(channel_id)
+        if not channel:
+            logger.warning(f"Canal de logs introuvable pour le serveur {guild_id} (ID: {channel_id})")
+            return False
+
+        try:
+            await channel.send(embed=build_log_embed(events, dropped))
+            logger.debug(f"{len(events)} logs envoyés au canal {channel_id} pour le serveur {guild_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors de l'envoi du log: {e}")
+            return False
+
+def _format_event(event):
+    """Texte d'un événement, avec son nombre de répétitions"""
+    text = event.message
+    if event.count > 1:
+        text += f" (×{event.count})"
+    return text
+
+def build_log_embed(events, dropped=0):
+    """Construit l'embed d'un lot d'événements de log"""
+    # Couleur de l'erreur la plus récente, sinon celle du dernier événement
+    errors = [event for event in events if event.is_error]
+    color = (errors or events)[-1].color
+
+    if len(events) == 1 and not dropped:
+        # Un seul événement: même présentation qu'un log individuel
+        event = events[0]
+        embed = discord.Embed(description=_format_event(event), color=color, timestamp=event.time)
+        if event.title:
+            embed.title = event.title
+        embed.set_footer(text=f"Bot RSS • Log")
+        return embed
+
+    embed = discord.Embed(title="📝 Journal du bot", color=color, timestamp=events[-1].time)
+    size = len(embed.title)
+    for event in events:
+        name = f"{event.title or 'ℹ️ Information'} • {event.time.strftime('%H:%M:%S')}"
+        value = _format_event(event)
+        if len(value) > MAX_FIELD_VALUE:
+            value = value[:MAX_FIELD_VALUE - 3] + "..."
+        if size + len(name) + len(value) > MAX_EMBED_CHARS - 100:
+            dropped += 1
+            continue
+        size += len(name) + len(value)
+        embed.add_field(name=name, value=value, inline=False)
+
+    if dropped:
+        embed.description = f"⚠️ {dropped} événements ignorés (trop de logs sur la période)"
+    embed.set_footer(text=f"Bot RSS • {len(events)} logs")
+    return embed
+
+# Tampon de logs partagé
+log_sink = LogSink()
+Gauge("rss_log_queue_depth", "Événements de log en attente d'envoi", lambda: log_sink.depth)
+
 async def send_log(bot, guild_id, message, color=discord.Color.blue(), title=None):
-    """Envoie un message de log dans le canal configuré"""
+    """Met un message de log en attente pour le canal configuré
+
+    Les logs sont regroupés par serveur et envoyés périodiquement par log_sink.
+    """
     try:
         guild_id_str = str(guild_id)
         
@@ -14,27 +197,8 @@ async def send_log(bot, guild_id, message, color=discord.Color.blue(), title=Non
             logger.debug(f"Pas de canal de logs configuré pour le serveur {guild_id}")
             return False
         
-        channel_id = log_channels[guild_id_str]
-        channel = bot.get_channel(channel_id)
-        
-        if not channel:
-            logger.warning(f"Canal de logs introuvable pour le serveur {guild_id} (ID: {channel_id})")
-            return False
-        
-        embed = discord.Embed(
-            description=message,
-            color=color,
-            timestamp=datetime.now()
-        )
-        
-        if title:
-            embed.title = title
-            
-        embed.set_footer(text=f"Bot RSS • Log")
-        
-        await channel.send(embed=embed)
-        logger.debug(f"Log envoyé au canal {channel_id} pour le serveur {guild_id}")
+        log_sink.add(bot, guild_id_str, message, color, title)
         return True
     except Exception as e:
         logger.error(f"Erreur lors de l'envoi du log: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,137 @@
+import time
+import bisect
+import logging
+import threading
+from config import METRICS_HOST, METRICS_PORT
+
+logger = logging.getLogger(__name__)
+
+# Métriques déclarées par les modules, dans l'ordre de déclaration
+_registry = []
+_runner = None
+
+# Bornes par défaut des histogrammes (secondes)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+class Counter:
+    """Compteur croissant, éventuellement décliné par étiquettes"""
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}  # {valeurs des étiquettes: total}
+        self._lock = threading.Lock()  # Certains compteurs sont incrémentés depuis des threads
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, key)} {value}"
+
+class Histogram:
+    """Distribution de durées (ou de tailles) par tranches cumulées"""
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # Dernière tranche: +Inf
+        self._sum = 0
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self):
+        """Gestionnaire de contexte qui mesure la durée du bloc"""
+        return _Timer(self)
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        total = 0
+        for bound, count in zip(self.buckets, self._counts):
+            total += count
+            yield f'{self.name}_bucket{{le="{bound}"}} {total}'
+        total += self._counts[-1]
+        yield f'{self.name}_bucket{{le="+Inf"}} {total}'
+        yield f"{self.name}_sum {self._sum}"
+        yield f"{self.name}_count {total}"
+
+class Gauge:
+    """Valeur instantanée lue au moment de la collecte"""
+
+    def __init__(self, name, documentation, callback):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        _registry.append(self)
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        try:
+            yield f"{self.name} {self.callback()}"
+        except Exception as e:
+            logger.debug(f"Métrique {self.name} indisponible: {e}")
+
+class _Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+def render():
+    """Texte de toutes les métriques au format d'exposition Prometheus"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+async def start_metrics_server():
+    """Démarre le point d'accès HTTP /metrics si METRICS_PORT est configuré"""
+    global _runner
+    if METRICS_PORT is None or _runner is not None:
+        return
+    from aiohttp import web
+
+    async def handle_metrics(request):
+        return web.Response(text=render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    _runner = web.AppRunner(app, access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, METRICS_HOST, METRICS_PORT).start()
+    logger.info(f"Métriques disponibles sur http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
+async def stop_metrics_server():
+    """Arrête le point d'accès des métriques"""
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+    _runner = None
@@ -0,0 +1,37 @@
+class Entry:
+    """Article normalisé, construit une seule fois par article parsé
+
+    Ne contient que les champs publiés (et le texte de filtrage), sans la
+    mécanique d'accès de FeedParserDict. Sérialisable pour le pool de parsing.
+    """
+    __slots__ = ("id", "link", "title", "description", "search_text", "published", "timestamp", "image", "categories", "author")
+
+    def __init__(self, id, link, title, description, search_text, published, timestamp, image, categories, author):
+        self.id = id
+        self.link = link
+        self.title = title
+        self.description = description
+        self.search_text = search_text
+        self.published = published
+        self.timestamp = timestamp  # secondes UTC, None si l'article n'est pas daté
+        self.image = image
+        self.categories = categories
+        self.author = author
+
+    def __repr__(self):
+        return f"Entry(id={self.id!r}, title={self.title!r})"
+
+class FeedMeta:
+    """Flux normalisé: métadonnées publiées et liste des articles (Entry)"""
+    __slots__ = ("title", "link", "image", "bozo", "update_interval", "entries")
+
+    def __init__(self, title, link, image, bozo, update_interval, entries):
+        self.title = title
+        self.link = link
+        self.image = image
+        self.bozo = bozo
+        self.update_interval = update_interval  # secondes (<ttl> ou sy:updatePeriod), None si absent
+        self.entries = entries
+
+    def __repr__(self):
+        return f"FeedMeta(title={self.title!r}, entries={len(self.entries)})"
@@ -0,0 +1,224 @@
+import time
+import asyncio
+import hashlib
+import logging
+from utils.fetcher import fetch_feed, parse_feed, get_validators, HostThrottled
+from config import SEEN_ENTRIES_LIMIT
+from utils.storage import rss_configs, feed_validators, seen_entries, get_seen_entries, save_config
+from utils.scheduler import update_schedule, record_success, record_failure, is_paused
+from utils.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+CYCLE_DURATION = Histogram("rss_cycle_duration_seconds", "Durée d'une vérification complète de tous les flux (checkrss)")
+CHECK_RESULTS = Counter("rss_feed_checks_total", "Vérifications de flux par résultat (parsed, not_modified, unchanged, errors)", labels=("result",))
+
+# Vérifications depuis le démarrage par résultat (ordonnanceur et checkrss)
+check_totals = {"parsed": 0, "not_modified": 0, "unchanged": 0, "errors": 0}
+
+def _count_check(result):
+    check_totals[result] += 1
+    CHECK_RESULTS.inc(result=result)
+
+def plan_cycle(configs):
+    """Construit l'index inverse {url du flux: [guild_id, ...]} des abonnements"""
+    plan = {}
+    for guild_id, config in list(configs.items()):
+        for rss_url in config["feeds"]:
+            plan.setdefault(rss_url, []).append(guild_id)
+    return plan
+
+async def fetch_if_modified(url, force=False):
+    """Télécharge un flux et le parse seulement si son contenu a changé
+
+    Retourne un couple (statut, flux) où le statut vaut "not_modified" (304),
+    "unchanged" (contenu identique au précédent) ou "parsed". Avec `force`,
+    le flux est téléchargé et parsé même s'il n'a pas changé.
+    """
+    previous = {} if force else feed_validators.get(url, {})
+    result = await fetch_feed(url, previous)
+    if result.status == 304:
+        logger.debug(f"Flux inchangé (304): {url}")
+        record_success(url)
+        update_schedule(url, headers=result.headers)
+        _count_check("not_modified")
+        return "not_modified", None
+
+    # Empreinte du contenu brut pour les serveurs qui ignorent les requêtes conditionnelles
+    validators = get_validators(result)
+    validators["digest"] = hashlib.blake2b(result.content, digest_size=16).hexdigest()
+    if validators["digest"] == previous.get("digest"):
+        logger.debug(f"Flux inchangé (contenu identique): {url}")
+        feed_validators[url] = validators
+        record_success(url)
+        update_schedule(url, headers=result.headers)
+        _count_check("unchanged")
+        return "unchanged", None
+
+    try:
+        feed = await parse_feed(result)
+    except Exception:
+        # Oublier les validateurs et l'empreinte: le même contenu doit être reparsé au prochain essai
+        feed_validators.pop(url, None)
+        raise
+    # Les validateurs ne sont enregistrés qu'une fois le contenu parsé
+    feed_validators[url] = validators
+    record_success(url)
+    update_schedule(url, feed, result.headers)
+    _count_check("parsed")
+    return "parsed", feed
+
+def record_check_error(url, error):
+    """Planifie le prochain essai d'un flux en échec (retourne True si le flux vient d'être mis en pause)"""
+    _count_check("errors")
+    if isinstance(error, HostThrottled):
+        # L'hôte est en pause, pas le flux: réessayer au rythme habituel
+        update_schedule(url)
+        return False
+    return record_failure(url, error)
+
+async def fetch_cycle(plan, force=()):
+    """Télécharge et parse une seule fois chaque flux unique du plan
+
+    Les flux en pause (circuit ouvert) ne sont pas téléchargés: seul
+    l'ordonnanceur les sonde à la fin de leur pause, et un échec de plus
+    allongerait cette pause. Les flux de `force` sont parsés même s'ils
+    n'ont pas changé. Retourne un couple (flux, statistiques) où flux est un
+    dictionnaire {url: résumé du flux, None si inchangé, ou exception}; les
+    flux en pause n'y figurent pas.
+    """
+    now = time.time()
+    paused = {url for url in plan if is_paused(url, now)}
+    urls = [url for url in plan if url not in paused]
+    started = time.perf_counter()
+    results = await asyncio.gather(*(fetch_if_modified(url, url in force) for url in urls), return_exceptions=True)
+    CYCLE_DURATION.observe(time.perf_counter() - started)
+
+    feeds = {}
+    stats = {"parsed": 0, "not_modified": 0, "unchanged": 0, "errors": 0, "paused": len(paused)}
+    for url, result in zip(urls, results):
+        if isinstance(result, Exception):
+            feeds[url] = result
+            stats["errors"] += 1
+            record_check_error(url, result)
+        else:
+            status, feeds[url] = result
+            stats[status] += 1
+
+    subscriptions = sum(len(guilds) for guilds in plan.values())
+    logger.info(f"{len(urls)} flux uniques récupérés pour {subscriptions} abonnements "
+                f"({stats['parsed']} parsés, {stats['not_modified']} non modifiés, "
+                f"{stats['unchanged']} inchangés, {stats['errors']} erreurs, {stats['paused']} en pause ignorés)")
+    return feeds, stats
+
+def mark_entries_seen(rss_url, feed):
+    """Marque tous les articles actuels d'un flux comme vus"""
+    entry_ids = [entry.id for entry in reversed(feed.entries)]
+    get_seen_entries(rss_url).update(entry_id for entry_id in entry_ids if entry_id)
+
+def detect_new_entries(rss_url, feed):
+    """Retourne les nouveaux articles d'un flux (du plus récent au plus ancien)
+
+    Les articles retournés sont marqués comme vus. Lors de la première
+    vérification d'un flux, aucun article n'est considéré comme nouveau.
+    """
+    if not feed.entries:
+        logger.warning(f"Aucune entrée dans le flux: {rss_url}")
+        return []
+
+    new_entries = []
+    if rss_url in seen_entries:
+        seen = seen_entries[rss_url]
+        for entry in feed.entries:
+            entry_id = entry.id
+            if entry_id and entry_id not in seen:
+                new_entries.append(entry)
+    else:
+        logger.info(f"Premiers articles enregistrés pour {rss_url}")
+
+    mark_entries_seen(rss_url, feed)
+    return new_entries
+
+def migrate_legacy_cursors(rss_url, feed, guild_ids):
+    """Reprend l'ancien curseur last_id de chaque serveur lors de la première vérification d'un flux
+
+    Les articles publiés après le curseur d'un serveur sont mis en attente
+    pour ce serveur seulement: les autres abonnés ne reçoivent pas cet
+    historique.
+    """
+    for guild_id in guild_ids:
+        last_id = rss_configs.get(guild_id, {}).get("feeds", {}).get(rss_url)
+        if last_id is None:
+            continue
+        backlog = []
+        for entry in feed.entries:
+            if entry.id == last_id:
+                break
+            backlog.append(entry)
+        defer_entries(guild_id, rss_url, backlog)
+
+def collect_new_entries(plan, feeds):
+    """Détecte une seule fois les nouveaux articles de chaque flux parsé
+
+    Retourne un dictionnaire {url: [nouveaux articles]}.
+    """
+    new_entries = {}
+    for rss_url, feed in feeds.items():
+        if feed is None or isinstance(feed, Exception):
+            continue
+        if rss_url not in seen_entries:
+            migrate_legacy_cursors(rss_url, feed, plan[rss_url])
+        new_entries[rss_url] = detect_new_entries(rss_url, feed)
+
+    if feeds:
+        save_config()  # Sauvegarder les articles vus et la planification des flux
+    return new_entries
+
+def has_pending_entries(guild_id, rss_url):
+    """Indique si des articles d'un flux attendent d'être publiés pour un serveur"""
+    return rss_url in rss_configs.get(guild_id, {}).get("pending_entries", {})
+
+def defer_entries(guild_id, rss_url, entries):
+    """Met en attente pour un serveur les articles d'un flux qu'il n'a pas pu recevoir
+
+    Les identifiants sont gardés dans la configuration du serveur (au plus
+    SEEN_ENTRIES_LIMIT par flux), et les articles sont publiés par
+    take_pending_entries dès que le serveur peut les recevoir.
+    """
+    entry_ids = [entry.id for entry in reversed(entries) if entry.id]
+    if not entry_ids:
+        return
+    config = rss_configs[guild_id]
+    pending = config.get("pending_entries", {})
+    entry_ids = list(dict.fromkeys(pending.get(rss_url, []) + entry_ids))[-SEEN_ENTRIES_LIMIT:]
+    # Remplacé, jamais modifié en place: une copie peut être en cours d'écriture
+    config["pending_entries"] = {**pending, rss_url: entry_ids}
+    save_config()
+
+def discard_pending_entries(guild_id, rss_url):
+    """Retire les articles d'un flux en attente pour un serveur et retourne leurs identifiants"""
+    config = rss_configs.get(guild_id, {})
+    pending = config.get("pending_entries", {})
+    if rss_url not in pending:
+        return []
+
+    entry_ids = pending[rss_url]
+    pending = {url: ids for url, ids in pending.items() if url != rss_url}
+    if pending:
+        config["pending_entries"] = pending
+    else:
+        del config["pending_entries"]
+    save_config()
+    return entry_ids
+
+def take_pending_entries(guild_id, rss_url, feed, new_entries):
+    """Retourne les articles à publier pour un serveur: ceux en attente et les nouveaux
+
+    Les articles sont retournés du plus récent au plus ancien. Les articles
+    en attente qui ne sont plus dans le flux sont abandonnés.
+    """
+    pending_ids = set(discard_pending_entries(guild_id, rss_url))
+    if not pending_ids:
+        return new_entries
+    new_ids = {id(entry) for entry in new_entries}
+    return [entry for entry in feed.entries if id(entry) in new_ids or entry.id in pending_ids]
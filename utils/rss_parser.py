@@ -1,12 +1,28 @@
 import feedparser
+import calendar
 from datetime import datetime
 import hashlib
-from bs4 import BeautifulSoup
+from collections import OrderedDict
+from html.parser import HTMLParser
 from email.utils import parsedate_to_datetime
 import logging
+from config import ENTRY_TEXT_CACHE_SIZE
+from utils.keyword_matcher import KeywordMatcher
+from utils.models import Entry, FeedMeta
+from utils.metrics import Histogram
 
 logger = logging.getLogger(__name__)
 
+# Mesurées dans le processus courant (pas dans les processus du pool de parsing)
+CLEAN_HTML_DURATION = Histogram("rss_clean_html_duration_seconds", "Durée du nettoyage HTML d'un texte")
+KEYWORD_MATCH_DURATION = Histogram("rss_keyword_match_duration_seconds", "Durée de la recherche des mots-clés dans un article")
+
+# Durée (en secondes) des périodes de mise à jour annoncées par sy:updatePeriod
+_UPDATE_PERIODS = {"hourly": 3600, "daily": 86400, "weekly": 604800, "monthly": 2592000, "yearly": 31536000}
+
+# Cache des textes extraits par article: {(id, empreinte du contenu): (description, texte de recherche)}
+_entry_text_cache = OrderedDict()
+
 def get_color_for_url(url):
     """Génère une couleur basée sur l'URL du flux"""
     hash_object = hashlib.md5(url.encode())
@@ -26,101 +42,223 @@ def get_color_for_url(url):
     # Convertir en valeur décimale pour Discord
     return (r << 16) + (g << 8) + b
 
+def get_entry_id(entry):
+    """Retourne l'identifiant d'un article (id, lien ou, à défaut, titre)"""
+    return entry.get('id') or entry.get('link') or entry.get('title')
+
 def parse_date(entry):
     """Parse la date d'un article RSS"""
-    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-        return datetime(*entry.published_parsed[:6])
-    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-        return datetime(*entry.updated_parsed[:6])
-    elif hasattr(entry, 'published') and entry.published:
+    if entry.get('published_parsed'):
+        return datetime(*entry['published_parsed'][:6])
+    elif entry.get('updated_parsed'):
+        return datetime(*entry['updated_parsed'][:6])
+    elif entry.get('published'):
         try:
-            return parsedate_to_datetime(entry.published)
+            return parsedate_to_datetime(entry['published'])
         except:
             pass
-    elif hasattr(entry, 'updated') and entry.updated:
+    elif entry.get('updated'):
         try:
-            return parsedate_to_datetime(entry.updated)
+            return parsedate_to_datetime(entry['updated'])
         except:
             pass
 
     return datetime.now()
 
+def parse_timestamp(entry):
+    """Retourne la date de publication d'un article en secondes UTC (None si absente)"""
+    for key in ('published_parsed', 'updated_parsed'):
+        if entry.get(key):
+            return calendar.timegm(entry[key])
+    return None
+
+def get_update_interval(feed):
+    """Retourne l'intervalle de mise à jour annoncé par le flux en secondes (<ttl> ou sy:updatePeriod)"""
+    intervals = []
+    try:
+        if feed.get('ttl'):
+            intervals.append(int(feed['ttl']) * 60)  # <ttl> est en minutes
+    except (TypeError, ValueError):
+        pass
+
+    period = _UPDATE_PERIODS.get(str(feed.get('sy_updateperiod', "")).strip().lower())
+    if period:
+        try:
+            frequency = int(feed.get('sy_updatefrequency') or 1)
+        except (TypeError, ValueError):
+            frequency = 1
+        intervals.append(period // max(frequency, 1))
+
+    intervals = [interval for interval in intervals if interval > 0]
+    return max(intervals) if intervals else None
+
+class _TextExtractor(HTMLParser):
+    """Extrait le texte d'un fragment HTML au fil de l'analyse, sans construire d'arbre
+
+    Reproduit BeautifulSoup(html, 'html.parser').get_text(separator=' ', strip=True):
+    les commentaires et le contenu des balises script/style/template sont ignorés.
+    """
+    _IGNORED_TAGS = ("script", "style", "template")
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._ignored_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._IGNORED_TAGS:
+            self._ignored_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._IGNORED_TAGS and self._ignored_depth:
+            self._ignored_depth -= 1
+
+    def handle_data(self, data):
+        if not self._ignored_depth:
+            data = data.strip()
+            if data:
+                self.parts.append(data)
+
+    def unknown_decl(self, data):
+        # Les sections CDATA sont conservées comme du texte
+        if data.startswith("CDATA["):
+            self.handle_data(data[len("CDATA["):])
+
 def clean_html(html_text):
     """Nettoie le HTML"""
     if not html_text:
         return ""
-    soup = BeautifulSoup(html_text, 'html.parser')
-    return soup.get_text(separator=' ', strip=True)
+    if "<" not in html_text and "&" not in html_text:
+        return html_text.strip()
+    with CLEAN_HTML_DURATION.time():
+        extractor = _TextExtractor()
+        extractor.feed(html_text)
+        extractor.close()
+        return " ".join(extractor.parts)
 
-def contains_keywords(entry, keywords):
-    """Vérifie si un article contient des mots-clés"""
-    if not keywords:  # Si aucun mot-clé n'est spécifié, tout est accepté
-        return True
+def _get_entry_texts(entry):
+    """Retourne (description, texte de recherche en minuscules) d'un article
 
-    # Obtenir le texte à vérifier
-    text_to_check = ""
+    Le HTML de chaque article n'est nettoyé qu'une fois: le résultat est mis en
+    cache (LRU borné) par identifiant d'article et empreinte du contenu.
+    """
+    title = entry.get('title')
+    summary = entry.get('summary')
+    if summary is None:
+        summary = entry.get('description')
+    contents = [content['value'] for content in entry.get('content', ()) if 'value' in content]
 
-    # Ajouter le titre
-    if hasattr(entry, 'title'):
-        text_to_check += entry.title + " "
+    digest = hashlib.blake2b(digest_size=8)
+    for part in (title, summary, *contents):
+        digest.update((part or "").encode())
+        digest.update(b"\0")
+    key = (get_entry_id(entry), digest.digest())
 
-    # Ajouter la description/résumé
-    if hasattr(entry, 'summary'):
-        text_to_check += clean_html(entry.summary) + " "
-    elif hasattr(entry, 'description'):
-        text_to_check += clean_html(entry.description) + " "
+    texts = _entry_text_cache.get(key)
+    if texts is not None:
+        _entry_text_cache.move_to_end(key)
+        return texts
 
-    # Ajouter le contenu
-    if hasattr(entry, 'content'):
-        for content in entry.content:
-            if 'value' in content:
-                text_to_check += clean_html(content.value) + " "
+    description = clean_html(summary) if summary is not None else ""
+
+    # Texte utilisé pour le filtrage: titre, description/résumé puis contenu
+    text_to_check = ""
+    if title is not None:
+        text_to_check += title + " "
+    if summary is not None:
+        text_to_check += description + " "
+    for value in contents:
+        text_to_check += clean_html(value) + " "
 
     # Convertir en minuscules pour une recherche insensible à la casse
-    text_to_check = text_to_check.lower()
+    texts = (description, text_to_check.lower())
+    _entry_text_cache[key] = texts
+    if len(_entry_text_cache) > ENTRY_TEXT_CACHE_SIZE:
+        _entry_text_cache.popitem(last=False)
+    return texts
+
+def contains_keywords(entry, keywords):
+    """Vérifie si un article (Entry) contient des mots-clés (liste ou KeywordMatcher compilé)"""
+    if not keywords:  # Si aucun mot-clé n'est spécifié, tout est accepté
+        return True
 
-    # Vérifier chaque mot-clé
-    for keyword in keywords:
-        if keyword.lower() in text_to_check:
-            return True
+    if not isinstance(keywords, KeywordMatcher):
+        keywords = KeywordMatcher(keywords)
+    with KEYWORD_MATCH_DURATION.time():
+        return keywords.matches(entry.search_text)
 
-    return False
+def find_keywords(entry, matcher):
+    """Retourne les mots-clés d'un KeywordMatcher présents dans un article (Entry)"""
+    with KEYWORD_MATCH_DURATION.time():
+        return matcher.find(entry.search_text)
 
 def get_feed_image(feed):
     """Récupère l'image du flux"""
-    if hasattr(feed, 'image') and hasattr(feed.image, 'href'):
-        return feed.image.href
+    image = feed.get('image')
+    if image:
+        return image.get('href')
     return None
 
 def get_entry_image(entry):
     """Récupère l'image d'un article"""
-    image_url = None
-    
     # Vérifier les médias
-    if hasattr(entry, 'media_content') and entry.media_content:
-        for media in entry.media_content:
-            if 'url' in media and media['url'].endswith(('.jpg', '.jpeg', '.png', '.gif')):
-                image_url = media['url']
-                break
+    for media in entry.get('media_content') or ():
+        url = media.get('url')
+        if url and url.endswith(('.jpg', '.jpeg', '.png', '.gif')):
+            return url
     
     # Vérifier les enclosures
-    if not image_url and hasattr(entry, 'enclosures') and entry.enclosures:
-        for enclosure in entry.enclosures:
-            if 'type' in enclosure and enclosure['type'].startswith('image/'):
-                image_url = enclosure['href']
-                break
+    for enclosure in entry.get('enclosures') or ():
+        if enclosure.get('type', '').startswith('image/'):
+            return enclosure.get('href')
     
     # Vérifier les liens
-    if not image_url and hasattr(entry, 'links'):
-        for link in entry.links:
-            if 'type' in link and link['type'].startswith('image/'):
-                image_url = link['href']
-                break
+    for link in entry.get('links') or ():
+        if link.get('type', '').startswith('image/'):
+            return link.get('href')
     
-    return image_url
+    return None
 
 def get_entry_categories(entry):
     """Récupère les catégories d'un article"""
-    if hasattr(entry, 'tags'):
-        return [tag.term for tag in entry.tags if hasattr(tag, 'term')]
-    return []
\ No newline at end of file
+    return [tag['term'] for tag in entry.get('tags') or () if tag.get('term')]
+
+def build_entry(entry):
+    """Construit l'Entry normalisé d'un article parsé par feedparser"""
+    description, search_text = _get_entry_texts(entry)
+
+    # Limiter la longueur de la description (seule la partie publiée est gardée)
+    if len(description) > 300:
+        description = description[:300] + "..."
+
+    return Entry(
+        id=get_entry_id(entry),
+        link=entry.get('link'),
+        title=entry.get('title', ""),
+        description=description,
+        search_text=search_text,
+        published=parse_date(entry),
+        timestamp=parse_timestamp(entry),
+        image=get_entry_image(entry),
+        categories=get_entry_categories(entry),
+        author=entry.get('author')
+    )
+
+def build_feed(parsed):
+    """Construit le FeedMeta normalisé d'un flux parsé par feedparser"""
+    return FeedMeta(
+        title=parsed.feed.get('title'),
+        link=parsed.feed.get('link'),
+        image=get_feed_image(parsed.feed),
+        bozo=bool(parsed.bozo),
+        update_interval=get_update_interval(parsed.feed),
+        entries=[build_entry(entry) for entry in parsed.entries]
+    )
+
+def parse_feed_content(content, response_headers=None):
+    """Parse le contenu brut d'un flux et retourne son FeedMeta
+
+    Fonction de niveau module pour pouvoir être exécutée dans un processus
+    du pool de parsing.
+    """
+    return build_feed(feedparser.parse(content, response_headers=response_headers))
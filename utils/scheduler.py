@@ -0,0 +1,292 @@
+import re
+import time
+import heapq
+import random
+import asyncio
+import logging
+import statistics
+from email.utils import parsedate_to_datetime
+from config import (POLL_MIN_INTERVAL, POLL_DEFAULT_INTERVAL, POLL_MAX_INTERVAL,
+                    POLL_INTERVAL_FACTOR, POLL_HISTORY, SCHEDULER_WORKERS,
+                    SCHEDULER_JITTER, SCHEDULER_SYNC_INTERVAL, SCHEDULER_SUMMARY_INTERVAL,
+                    FEED_CIRCUIT_THRESHOLD,
+                    FEED_CIRCUIT_OPEN_TIME, FEED_CIRCUIT_MAX_OPEN_TIME)
+from utils.storage import rss_configs, feed_schedules, save_config, forget_feed
+from utils.metrics import Histogram, Gauge
+
+logger = logging.getLogger(__name__)
+
+CHECK_DURATION = Histogram("rss_feed_check_duration_seconds", "Durée de la vérification d'un flux (téléchargement, parsing et publication)")
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+def get_cache_lifetime(headers):
+    """Durée de fraîcheur (en secondes) annoncée par Cache-Control ou Expires, None si absente"""
+    cache_control = headers.get("cache-control", "")
+    if "no-cache" in cache_control.lower() or "no-store" in cache_control.lower():
+        return None
+    match = _MAX_AGE.search(cache_control)
+    if match:
+        return int(match.group(1)) or None
+
+    if "expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["expires"]).timestamp()
+            now = parsedate_to_datetime(headers["date"]).timestamp() if "date" in headers else time.time()
+        except (TypeError, ValueError):
+            return None  # Expires invalide (souvent "0" ou "-1"): contenu déjà expiré
+        return int(expires - now) if expires > now else None
+    return None
+
+def get_publish_rate(feed):
+    """Retourne (écart médian entre deux publications, date de la plus récente) en secondes UTC
+
+    L'écart vaut None si le flux ne contient pas au moins deux articles datés.
+    """
+    timestamps = sorted({entry.timestamp for entry in feed.entries if entry.timestamp}, reverse=True)
+    if not timestamps:
+        return None, None
+    timestamps = timestamps[:POLL_HISTORY]
+    gaps = [newer - older for newer, older in zip(timestamps, timestamps[1:])]
+    return (statistics.median(gaps) if gaps else None), timestamps[0]
+
+def compute_interval(schedule, cache_lifetime=None, now=None):
+    """Calcule l'intervalle de vérification d'un flux à partir de son rythme de publication
+
+    Un flux est vérifié une fraction POLL_INTERVAL_FACTOR de l'écart attendu
+    avant sa prochaine publication. Cet écart s'allonge quand le flux n'a rien
+    publié depuis longtemps. Les durées annoncées par le flux (<ttl>,
+    sy:updatePeriod) ou par le serveur (Cache-Control, Expires) sont des
+    minimums. Le résultat est borné par POLL_MIN_INTERVAL et POLL_MAX_INTERVAL.
+    """
+    now = time.time() if now is None else now
+    interval = POLL_DEFAULT_INTERVAL
+
+    gap = schedule.get("gap")
+    if gap:
+        expected = gap
+        if schedule.get("latest"):
+            # Un flux silencieux depuis longtemps a peu de chances de publier bientôt
+            expected = max(gap, (now - schedule["latest"]) / 2)
+        interval = expected * POLL_INTERVAL_FACTOR
+
+    hints = [hint for hint in (schedule.get("hint"), cache_lifetime) if hint]
+    if hints:
+        interval = max(interval, max(hints))
+
+    return int(min(max(interval, POLL_MIN_INTERVAL), POLL_MAX_INTERVAL))
+
+def update_schedule(url, feed=None, headers=None, now=None):
+    """Met à jour le rythme de publication d'un flux et planifie sa prochaine vérification
+
+    `feed` (FeedMeta) n'est fourni que si le flux a été parsé; sinon le
+    rythme déjà connu est réutilisé. Retourne l'intervalle choisi.
+    """
+    now = time.time() if now is None else now
+    schedule = feed_schedules.setdefault(url, {})
+    if feed is not None:
+        gap, latest = get_publish_rate(feed)
+        schedule.update(gap=gap, latest=latest, hint=feed.update_interval)
+
+    interval = compute_interval(schedule, get_cache_lifetime(headers) if headers else None, now)
+    schedule["interval"] = interval
+    schedule["next_due"] = now + interval
+    logger.debug(f"Prochaine vérification de {url} dans {interval}s")
+    return interval
+
+def record_success(url):
+    """Remet à zéro l'état d'échec d'un flux après une vérification réussie
+
+    Retourne le nombre d'échecs consécutifs qui précédaient (0 si le flux était sain).
+    """
+    schedule = feed_schedules.get(url)
+    if not schedule or not schedule.get("failures"):
+        return 0
+    failures = schedule["failures"]
+    for key in ("failures", "trips", "state", "last_error"):
+        schedule.pop(key, None)
+    logger.info(f"Flux rétabli après {failures} échecs: {url}")
+    return failures
+
+def record_failure(url, error, now=None):
+    """Enregistre l'échec de la vérification d'un flux et planifie le prochain essai
+
+    L'intervalle double à chaque échec consécutif. Après FEED_CIRCUIT_THRESHOLD
+    échecs, le circuit s'ouvre: le flux est mis en pause FEED_CIRCUIT_OPEN_TIME
+    secondes, puis une seule vérification sert de sonde (semi-ouvert). Si elle
+    échoue, le flux repart en pause pour une durée doublée. Retourne True
+    lorsque le circuit vient de s'ouvrir.
+    """
+    now = time.time() if now is None else now
+    schedule = feed_schedules.setdefault(url, {})
+    failures = schedule.get("failures", 0) + 1
+    schedule["failures"] = failures
+    schedule["last_error"] = str(error)[:200]
+
+    if failures >= FEED_CIRCUIT_THRESHOLD or schedule.get("state") == "open":
+        trips = schedule.get("trips", 0) + 1
+        interval = min(FEED_CIRCUIT_OPEN_TIME * 2 ** (trips - 1), FEED_CIRCUIT_MAX_OPEN_TIME)
+        opened = schedule.get("state") != "open"
+        schedule.update(state="open", trips=trips, interval=interval, next_due=now + interval)
+        logger.warning(f"Flux en pause pour {interval}s après {failures} échecs: {url}")
+        return opened
+
+    interval = int(min(compute_interval(schedule, now=now) * 2 ** failures, POLL_MAX_INTERVAL))
+    schedule.update(interval=interval, next_due=now + interval)
+    return False
+
+def is_paused(url, now=None):
+    """Indique si un flux est en pause (circuit ouvert) jusqu'à une échéance encore à venir"""
+    now = time.time() if now is None else now
+    schedule = feed_schedules.get(url, {})
+    return schedule.get("state") == "open" and schedule.get("next_due", 0) > now
+
+class FeedScheduler:
+    """Ordonnanceur continu des vérifications de flux
+
+    Les flux sont rangés dans un tas-min de (échéance, url) et confiés dès
+    leur échéance à un pool borné de workers, qui appellent le gestionnaire
+    `handler(url, guild_ids)`. Chaque échéance reçoit un décalage aléatoire
+    pour étaler les requêtes. Les abonnements sont relus toutes les
+    SCHEDULER_SYNC_INTERVAL secondes (ou immédiatement après refresh()).
+    """
+
+    def __init__(self, workers=SCHEDULER_WORKERS):
+        self.workers = workers
+        self._handler = None
+        self._heap = []  # [(échéance, url)], les entrées périmées sont ignorées
+        self._scheduled = {}  # {url: échéance en vigueur dans le tas}
+        self._running = set()  # Flux en cours de vérification
+        self._subscribers = {}  # {url: [guild_id, ...]}
+        self._queue = None  # Flux dus en attente d'un worker
+        self._wakeup = None
+        self._next_sync = 0
+        self._summary = None  # (instant, totaux des vérifications) du dernier résumé
+        self._tasks = []
+        self.lag = 0  # Retard (en secondes) du dernier flux démarré sur son échéance
+
+    @property
+    def depth(self):
+        """Nombre de flux dus qui attendent d'être vérifiés"""
+        now = time.time()
+        overdue = sum(1 for url, due in self._scheduled.items() if due <= now)
+        return overdue + (self._queue.qsize() if self._queue is not None else 0)
+
+    def start(self, handler):
+        """Démarre l'ordonnanceur et ses workers (sans effet s'ils tournent déjà)"""
+        if self._tasks:
+            return
+        self._handler = handler
+        self._queue = asyncio.Queue(maxsize=self.workers)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._dispatch())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Ordonnanceur des flux démarré avec {self.workers} workers")
+
+    async def stop(self):
+        """Arrête l'ordonnanceur (les vérifications en cours sont annulées)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def refresh(self):
+        """Prend en compte immédiatement les abonnements modifiés"""
+        self._next_sync = 0
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _push(self, url, due):
+        """Planifie la prochaine vérification d'un flux, avec un décalage aléatoire"""
+        interval = feed_schedules.get(url, {}).get("interval", POLL_DEFAULT_INTERVAL)
+        due = max(due, time.time()) + random.uniform(0, interval * SCHEDULER_JITTER)
+        self._scheduled[url] = due
+        heapq.heappush(self._heap, (due, url))
+
+    def _sync(self, now):
+        """Ajoute au tas les nouveaux flux suivis"""
+        # Import local: utils.poller importe ce module
+        from utils.poller import plan_cycle
+
+        self._subscribers = plan_cycle(rss_configs)
+        for url in self._subscribers:
+            if url not in self._scheduled and url not in self._running:
+                self._push(url, feed_schedules.get(url, {}).get("next_due", 0))
+        self._next_sync = now + SCHEDULER_SYNC_INTERVAL
+
+        logger.debug(f"Ordonnanceur: {len(self._scheduled)} flux planifiés, {self.depth} en attente, retard {self.lag:.0f}s")
+        if self._summary is None or now - self._summary[0] >= SCHEDULER_SUMMARY_INTERVAL:
+            self._summarize(now)
+
+    def _summarize(self, now):
+        """Résume dans les logs les vérifications faites depuis le résumé précédent"""
+        from utils.poller import check_totals
+
+        if self._summary is not None:
+            started, previous = self._summary
+            stats = {result: count - previous[result] for result, count in check_totals.items()}
+            logger.info(f"Ordonnanceur: {sum(stats.values())} vérifications en {now - started:.0f}s "
+                        f"({stats['parsed']} parsés, {stats['not_modified']} non modifiés, "
+                        f"{stats['unchanged']} inchangés, {stats['errors']} erreurs), "
+                        f"{len(self._scheduled)} flux planifiés, {self.depth} en attente, retard {self.lag:.0f}s")
+        self._summary = (now, dict(check_totals))
+
+    async def _dispatch(self):
+        """Confie aux workers les flux arrivés à échéance"""
+        while True:
+            now = time.time()
+            if now >= self._next_sync:
+                self._sync(now)
+
+            while self._heap and self._heap[0][0] <= now:
+                due, url = heapq.heappop(self._heap)
+                if self._scheduled.get(url) != due:
+                    continue  # Entrée périmée
+                del self._scheduled[url]
+                if url not in self._subscribers:
+                    continue  # Flux supprimé entre-temps
+                self._running.add(url)
+                await self._queue.put((url, due))  # Attend qu'un worker se libère
+                now = time.time()
+
+            timeout = self._next_sync - now
+            if self._heap:
+                timeout = min(timeout, self._heap[0][0] - now)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(timeout, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self):
+        """Vérifie les flux dus puis les replanifie"""
+        while True:
+            url, due = await self._queue.get()
+            self.lag = max(0, time.time() - due)
+            try:
+                with CHECK_DURATION.time():
+                    await self._handler(url, list(self._subscribers.get(url, ())))
+            except Exception as e:
+                logger.error(f"Erreur lors de la vérification du flux {url}: {e}")
+            finally:
+                self._running.discard(url)
+                if self._is_followed(url):
+                    # Garantir une échéance future, même si le gestionnaire a échoué
+                    if feed_schedules.get(url, {}).get("next_due", 0) <= time.time():
+                        update_schedule(url)
+                        save_config()
+                    self._push(url, feed_schedules[url]["next_due"])
+                    self._wakeup.set()
+                else:
+                    # Flux retiré pendant sa vérification: effacer l'état que celle-ci a recréé
+                    forget_feed(url)
+                    save_config()
+
+    def _is_followed(self, url):
+        """Indique si un flux est toujours suivi (les abonnements de _subscribers peuvent dater du dernier _sync)"""
+        return any(url in rss_configs.get(guild_id, {}).get("feeds", {}) for guild_id in self._subscribers.get(url, ()))
+
+# Ordonnanceur partagé
+feed_scheduler = FeedScheduler()
+Gauge("rss_scheduler_queue_depth", "Flux dus en attente de vérification", lambda: feed_scheduler.depth)
+Gauge("rss_scheduler_lag_seconds", "Retard du dernier flux démarré sur son échéance", lambda: feed_scheduler.lag)
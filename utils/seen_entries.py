@@ -0,0 +1,64 @@
+import hashlib
+
+class SeenEntries:
+    """Ensemble borné des articles déjà vus pour un flux
+
+    Chaque article est représenté par une empreinte de 8 octets de son
+    identifiant, et les plus anciennes empreintes sont évincées au-delà de
+    la capacité. Un dict sert d'ensemble ordonné (ordre d'insertion).
+    `version` augmente à chaque modification, pour ne resérialiser que les
+    ensembles qui ont changé.
+    """
+    __slots__ = ("maxlen", "version", "_keys")
+
+    def __init__(self, maxlen, keys=()):
+        self.maxlen = maxlen
+        self.version = 0
+        self._keys = dict.fromkeys(keys)
+
+    @staticmethod
+    def key(entry_id):
+        """Calcule l'empreinte compacte d'un identifiant d'article"""
+        return int.from_bytes(hashlib.blake2b(entry_id.encode(), digest_size=8).digest(), "big")
+
+    def __contains__(self, entry_id):
+        return self.key(entry_id) in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def update(self, entry_ids):
+        """Marque des articles comme vus (du plus ancien au plus récent)
+
+        Les articles déjà connus sont rafraîchis pour ne pas être évincés tant
+        qu'ils restent présents dans le flux.
+        """
+        entry_ids = list(entry_ids)
+        self.version += 1
+        for entry_id in entry_ids:
+            key = self.key(entry_id)
+            self._keys.pop(key, None)
+            self._keys[key] = None
+
+        # Toujours conserver au moins les articles actuellement présents dans le flux
+        limit = max(self.maxlen, len(entry_ids))
+        while len(self._keys) > limit:
+            del self._keys[next(iter(self._keys))]
+
+    def snapshot(self):
+        """Copie brute des empreintes (rapide), à sérialiser ensuite avec serialize()"""
+        return tuple(self._keys)
+
+    @staticmethod
+    def serialize(keys):
+        """Convertit des empreintes brutes en liste d'empreintes hexadécimales"""
+        return [format(key, "016x") for key in keys]
+
+    def to_list(self):
+        """Sérialise l'ensemble sous forme de liste d'empreintes hexadécimales"""
+        return self.serialize(self._keys)
+
+    @classmethod
+    def from_list(cls, maxlen, values):
+        """Reconstruit l'ensemble depuis sa forme sérialisée"""
+        return cls(maxlen, (int(value, 16) for value in values))
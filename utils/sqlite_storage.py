@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guilds (
+    guild_id TEXT PRIMARY KEY,
+    channel_id INTEGER,
+    options TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS subscriptions (
+    guild_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    last_id TEXT,
+    PRIMARY KEY (guild_id, url)
+);
+CREATE INDEX IF NOT EXISTS subscriptions_url ON subscriptions (url);
+CREATE TABLE IF NOT EXISTS feed_state (
+    url TEXT PRIMARY KEY,
+    validators TEXT,
+    seen TEXT,
+    schedule TEXT
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    guild_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (guild_id, position)
+);
+CREATE TABLE IF NOT EXISTS log_channels (
+    guild_id TEXT PRIMARY KEY,
+    channel_id INTEGER NOT NULL
+);
+"""
+
+# Colonnes ajoutées après la création initiale du schéma: {table: {colonne: type}}
+MIGRATIONS = {
+    "feed_state": {"schedule": "TEXT"}
+}
+
+def _migrate(connection):
+    """Ajoute aux tables existantes les colonnes des versions plus récentes du schéma"""
+    for table, columns in MIGRATIONS.items():
+        existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+        for column, column_type in columns.items():
+            if column not in existing:
+                connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+def connect(path):
+    """Ouvre la base SQLite (mode WAL) et crée le schéma si nécessaire"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Les écritures sont faites dans un thread, sérialisées par l'appelant
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    _migrate(connection)
+    return connection
+
+def read_all(connection):
+    """Lit la base et retourne les données au même format que le fichier JSON
+
+    Tout l'état est chargé au démarrage, volontairement: l'ordonnanceur a
+    besoin de la planification de chaque flux pour construire son tas, le
+    premier balayage consulte les articles vus de tous les flux dans les
+    minutes qui suivent, et l'état reste borné (SEEN_ENTRIES_LIMIT empreintes
+    de 8 octets par flux). Seules les écritures sont incrémentales.
+    """
+    rss_configs = {}
+    for guild_id, channel_id, options in connection.execute("SELECT guild_id, channel_id, options FROM guilds"):
+        rss_configs[guild_id] = {**json.loads(options), "channel": channel_id, "feeds": {}}
+    for guild_id, url, last_id in connection.execute("SELECT guild_id, url, last_id FROM subscriptions"):
+        if guild_id in rss_configs:
+            rss_configs[guild_id]["feeds"][url] = last_id
+
+    server_keywords = {}
+    for guild_id, keyword in connection.execute("SELECT guild_id, keyword FROM keywords ORDER BY guild_id, position"):
+        server_keywords.setdefault(guild_id, []).append(keyword)
+
+    log_channels = dict(connection.execute("SELECT guild_id, channel_id FROM log_channels"))
+
+    feed_validators = {}
+    seen_entries = {}
+    feed_schedules = {}
+    for url, validators, seen, schedule in connection.execute("SELECT url, validators, seen, schedule FROM feed_state"):
+        if validators:
+            feed_validators[url] = json.loads(validators)
+        if seen:
+            seen_entries[url] = json.loads(seen)
+        if schedule:
+            feed_schedules[url] = json.loads(schedule)
+
+    return {
+        "rss_configs": rss_configs,
+        "server_keywords": server_keywords,
+        "log_channels": log_channels,
+        "feed_validators": feed_validators,
+        "seen_entries": seen_entries,
+        "feed_schedules": feed_schedules
+    }
+
+def _write_guilds(connection, old, new):
+    """Écrit les serveurs et abonnements modifiés"""
+    for guild_id in old.keys() - new.keys():
+        connection.execute("DELETE FROM guilds WHERE guild_id = ?", (guild_id,))
+        connection.execute("DELETE FROM subscriptions WHERE guild_id = ?", (guild_id,))
+
+    for guild_id, config in new.items():
+        previous = old.get(guild_id, {})
+        if config == previous:
+            continue
+
+        options = {key: value for key, value in config.items() if key not in ("channel", "feeds")}
+        previous_options = {key: value for key, value in previous.items() if key not in ("channel", "feeds")}
+        if not previous or config["channel"] != previous["channel"] or options != previous_options:
+            connection.execute(
+                "INSERT OR REPLACE INTO guilds (guild_id, channel_id, options) VALUES (?, ?, ?)",
+                (guild_id, config["channel"], json.dumps(options, ensure_ascii=False))
+            )
+
+        feeds = config["feeds"]
+        previous_feeds = previous.get("feeds", {})
+        for url in previous_feeds.keys() - feeds.keys():
+            connection.execute("DELETE FROM subscriptions WHERE guild_id = ? AND url = ?", (guild_id, url))
+        for url, last_id in feeds.items():
+            if url not in previous_feeds or previous_feeds[url] != last_id:
+                connection.execute(
+                    "INSERT OR REPLACE INTO subscriptions (guild_id, url, last_id) VALUES (?, ?, ?)",
+                    (guild_id, url, last_id)
+                )
+
+def _write_keywords(connection, old, new):
+    """Réécrit la liste de mots-clés des serveurs modifiés"""
+    for guild_id in old.keys() | new.keys():
+        keywords = new.get(guild_id)
+        if keywords == old.get(guild_id):
+            continue
+        connection.execute("DELETE FROM keywords WHERE guild_id = ?", (guild_id,))
+        if keywords:
+            connection.executemany(
+                "INSERT INTO keywords (guild_id, position, keyword) VALUES (?, ?, ?)",
+                [(guild_id, position, keyword) for position, keyword in enumerate(keywords)]
+            )
+
+def _write_log_channels(connection, old, new):
+    """Écrit les canaux de logs modifiés"""
+    for guild_id in old.keys() - new.keys():
+        connection.execute("DELETE FROM log_channels WHERE guild_id = ?", (guild_id,))
+    for guild_id, channel_id in new.items():
+        if old.get(guild_id) != channel_id:
+            connection.execute(
+                "INSERT OR REPLACE INTO log_channels (guild_id, channel_id) VALUES (?, ?)",
+                (guild_id, channel_id)
+            )
+
+def _write_feed_state(connection, old, new):
+    """Écrit l'état (validateurs, articles vus et planification) des flux modifiés"""
+    sections = ("feed_validators", "seen_entries", "feed_schedules")
+    urls = set()
+    for section in sections:
+        urls |= old.get(section, {}).keys() | new[section].keys()
+
+    for url in urls:
+        values = [new[section].get(url) for section in sections]
+        if values == [old.get(section, {}).get(url) for section in sections]:
+            continue
+        if all(value is None for value in values):
+            connection.execute("DELETE FROM feed_state WHERE url = ?", (url,))
+        else:
+            connection.execute(
+                "INSERT OR REPLACE INTO feed_state (url, validators, seen, schedule) VALUES (?, ?, ?, ?)",
+                (url, *(json.dumps(value) if value is not None else None for value in values))
+            )
+
+def write_changes(connection, old, new):
+    """Écrit dans une transaction uniquement les lignes qui diffèrent entre deux états"""
+    with connection:
+        _write_guilds(connection, old.get("rss_configs", {}), new["rss_configs"])
+        _write_keywords(connection, old.get("server_keywords", {}), new["server_keywords"])
+        _write_log_channels(connection, old.get("log_channels", {}), new["log_channels"])
+        _write_feed_state(connection, old, new)
+
+def migrate_from_json(json_file, connection):
+    """Importe une configuration JSON existante dans la base SQLite"""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        config_data = json.load(f)
+
+    new = {
+        "rss_configs": config_data.get("rss_configs", {}),
+        "server_keywords": config_data.get("server_keywords", {}),
+        "log_channels": config_data.get("log_channels", {}),
+        "feed_validators": config_data.get("feed_validators", {}),
+        "seen_entries": config_data.get("seen_entries", {}),
+        "feed_schedules": config_data.get("feed_schedules", {})
+    }
+    write_changes(connection, read_all(connection), new)
+    logger.info(f"Configuration migrée depuis {json_file}: {len(new['rss_configs'])} serveurs")
+
+if __name__ == "__main__":
+    # Utilisation: python -m utils.sqlite_storage [data/config.json] [data/config.db]
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    json_file = sys.argv[1] if len(sys.argv) > 1 else os.path.join("data", "config.json")
+    db_file = sys.argv[2] if len(sys.argv) > 2 else os.path.join("data", "config.db")
+    connection = connect(db_file)
+    migrate_from_json(json_file, connection)
+    connection.close()
@@ -1,49 +1,226 @@
 import os
+import copy
 import json
+import asyncio
 import logging
+from config import SEEN_ENTRIES_LIMIT, SAVE_DELAY, SAVE_DELAY_PER_FEED, STORAGE_BACKEND
+from utils.seen_entries import SeenEntries
+from utils import sqlite_storage
+from utils.metrics import Gauge
 
 logger = logging.getLogger(__name__)
 
 # Définir le chemin du fichier de configuration
 CONFIG_FILE = os.path.join("data", "config.json")
+DATABASE_FILE = os.path.join("data", "config.db")
 
 # Variables globales
 rss_configs = {}  # Dictionnaire pour stocker les configurations RSS
 server_keywords = {}  # Dictionnaire pour stocker les mots-clés par serveur
 log_channels = {}  # Dictionnaire pour stocker les canaux de logs
+feed_validators = {}  # Dictionnaire pour stocker ETag/Last-Modified et l'empreinte du contenu par flux
+seen_entries = {}  # Dictionnaire pour stocker les articles déjà vus par flux (SeenEntries)
+feed_schedules = {}  # Dictionnaire pour stocker le rythme de publication et la prochaine vérification par flux
 
-def save_config():
-    """Sauvegarde les configurations dans un fichier JSON"""
-    config_data = {
-        "rss_configs": rss_configs,
-        "server_keywords": server_keywords,
-        "log_channels": log_channels
+Gauge("rss_guilds", "Serveurs ayant des flux configurés", lambda: len(rss_configs))
+Gauge("rss_feeds", "Flux uniques suivis", lambda: len({url for config in rss_configs.values() for url in config["feeds"]}))
+Gauge("rss_subscriptions", "Abonnements (serveur, flux)", lambda: sum(len(config["feeds"]) for config in rss_configs.values()))
+
+# État de la sauvegarde différée
+_dirty = False
+_flush_task = None
+_flush_lock = None
+
+# Dernières copies des articles vus: {url: (version, empreintes brutes)} et {url: (empreintes brutes, liste sérialisée)}
+_seen_snapshots = {}
+_seen_serialized = {}
+
+# Base SQLite et dernier état écrit (pour n'écrire que les lignes modifiées)
+_database = None
+_last_written = {}
+
+def _snapshot():
+    """Copie légère des configurations, prise sur la boucle d'événements
+
+    Seuls les conteneurs modifiés en place sont copiés, et les articles vus
+    d'un flux ne sont recopiés (sous forme d'empreintes brutes) que s'ils ont
+    changé depuis la copie précédente. La conversion au format sérialisé est
+    faite par _serialize, hors de la boucle d'événements.
+    """
+    global _seen_snapshots
+    seen_snapshots = {}
+    for url, seen in seen_entries.items():
+        previous = _seen_snapshots.get(url)
+        if previous is None or previous[0] != seen.version:
+            previous = (seen.version, seen.snapshot())
+        seen_snapshots[url] = previous
+    _seen_snapshots = seen_snapshots
+
+    return {
+        "rss_configs": {guild_id: {**config, "feeds": dict(config["feeds"])} for guild_id, config in rss_configs.items()},
+        "server_keywords": {guild_id: list(keywords) for guild_id, keywords in server_keywords.items()},
+        "log_channels": dict(log_channels),
+        # Les validateurs d'un flux sont remplacés, jamais modifiés en place
+        "feed_validators": dict(feed_validators),
+        "seen_entries": {url: keys for url, (version, keys) in seen_snapshots.items()},
+        "feed_schedules": {url: dict(schedule) for url, schedule in feed_schedules.items()}
     }
-    
+
+def _serialize(snapshot):
+    """Convertit une copie prise par _snapshot au format du fichier JSON
+
+    Les listes d'empreintes hexadécimales des flux inchangés (même copie
+    brute que lors de l'écriture précédente) sont réutilisées.
+    """
+    global _seen_serialized
+    seen_serialized = {}
+    for url, keys in snapshot["seen_entries"].items():
+        previous = _seen_serialized.get(url)
+        if previous is None or previous[0] is not keys:
+            previous = (keys, SeenEntries.serialize(keys))
+        seen_serialized[url] = previous
+    _seen_serialized = seen_serialized
+    return {**snapshot, "seen_entries": {url: values for url, (keys, values) in seen_serialized.items()}}
+
+def _get_database():
+    """Retourne la connexion à la base SQLite, en l'ouvrant si nécessaire"""
+    global _database
+    if _database is None:
+        _database = sqlite_storage.connect(DATABASE_FILE)
+    return _database
+
+def _write_config(snapshot):
+    """Écrit la configuration (copie prise par _snapshot) avec le stockage configuré"""
+    global _last_written
+    config_data = _serialize(snapshot)
+    if STORAGE_BACKEND == "sqlite":
+        sqlite_storage.write_changes(_get_database(), _last_written, config_data)
+        _last_written = config_data
+        logger.debug(f"Configuration sauvegardée dans {DATABASE_FILE}")
+    else:
+        _write_json(config_data)
+
+def _write_json(config_data):
+    """Écrit la configuration de façon atomique (fichier temporaire + fsync + renommage)"""
     # Créer le dossier data s'il n'existe pas
     os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
 
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(config_data, f, ensure_ascii=False, indent=4)
+    tmp_file = CONFIG_FILE + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(config_data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, CONFIG_FILE)
     
-    logger.debug(f"Configuration sauvegardée: {len(rss_configs)} serveurs, {len(log_channels)} canaux de logs")
+    logger.debug(f"Configuration sauvegardée: {len(config_data['rss_configs'])} serveurs, {len(config_data['log_channels'])} canaux de logs")
 
-def load_config():
-    """Charge les configurations depuis un fichier JSON"""
-    global rss_configs, server_keywords, log_channels
+def save_config():
+    """Marque les configurations comme modifiées et planifie une sauvegarde groupée
 
-    if os.path.exists(CONFIG_FILE):
+    Hors de la boucle d'événements, la sauvegarde est immédiate.
+    """
+    global _dirty, _flush_task
+    _dirty = True
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _write_config(_snapshot())
+        _dirty = False
+        return
+
+    if _flush_task is None or _flush_task.done():
+        _flush_task = loop.create_task(_delayed_flush())
+
+def get_save_delay():
+    """Intervalle minimal entre deux sauvegardes, qui croît avec le nombre de flux suivis
+
+    Chaque sauvegarde reparcourt tout l'état: plus il est gros, plus les
+    écritures sont espacées.
+    """
+    return SAVE_DELAY + len(seen_entries) * SAVE_DELAY_PER_FEED
+
+async def _delayed_flush():
+    """Regroupe les modifications pendant get_save_delay() secondes avant d'écrire"""
+    while _dirty:
+        await asyncio.sleep(get_save_delay())
+        await flush_config()
+
+async def flush_config():
+    """Écrit immédiatement les configurations si elles ont été modifiées"""
+    global _dirty, _flush_lock
+    if _flush_lock is None:
+        _flush_lock = asyncio.Lock()
+
+    async with _flush_lock:
+        if not _dirty:
+            return
+        _dirty = False
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
-                rss_configs = config_data.get("rss_configs", {})
-                server_keywords = config_data.get("server_keywords", {})
-                log_channels = config_data.get("log_channels", {})
-            logger.info(f"Configuration chargée: {len(rss_configs)} serveurs, {len(log_channels)} canaux de logs")
+            await asyncio.to_thread(_write_config, _snapshot())
         except Exception as e:
-            logger.error(f"Erreur lors du chargement de la configuration: {e}")
-    else:
-        logger.info("Aucun fichier de configuration trouvé. Utilisation des valeurs par défaut.")
+            _dirty = True
+            logger.error(f"Erreur lors de la sauvegarde de la configuration: {e}")
+
+def forget_feed(rss_url):
+    """Supprime l'état d'un flux qui n'est plus suivi par aucun serveur"""
+    if any(rss_url in config["feeds"] for config in rss_configs.values()):
+        return
+    feed_validators.pop(rss_url, None)
+    seen_entries.pop(rss_url, None)
+    feed_schedules.pop(rss_url, None)
+
+def get_seen_entries(rss_url):
+    """Retourne l'ensemble des articles déjà vus d'un flux, en le créant si nécessaire"""
+    if rss_url not in seen_entries:
+        seen_entries[rss_url] = SeenEntries(SEEN_ENTRIES_LIMIT)
+    return seen_entries[rss_url]
+
+def _read_config():
+    """Lit les données depuis le stockage configuré (None s'il n'existe pas encore)"""
+    global _last_written
+    if STORAGE_BACKEND == "sqlite":
+        is_new = not os.path.exists(DATABASE_FILE)
+        database = _get_database()
+        if is_new and os.path.exists(CONFIG_FILE):
+            # Migration unique depuis l'ancien fichier JSON
+            sqlite_storage.migrate_from_json(CONFIG_FILE, database)
+        config_data = sqlite_storage.read_all(database)
+        _last_written = copy.deepcopy(config_data)
+        return config_data
+
+    if not os.path.exists(CONFIG_FILE):
+        return None
+    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_config():
+    """Charge les configurations depuis le fichier JSON ou la base SQLite"""
+    global _dirty
+    if _dirty:
+        # Ne pas perdre les modifications pas encore écrites
+        _write_config(_snapshot())
+        _dirty = False
+
+    try:
+        config_data = _read_config()
+        if config_data is None:
+            logger.info("Aucun fichier de configuration trouvé. Utilisation des valeurs par défaut.")
+            return
+
+        # Mettre à jour les dictionnaires en place pour que les modules
+        # qui les ont importés gardent une référence valide
+        for target, key in ((rss_configs, "rss_configs"), (server_keywords, "server_keywords"),
+                            (log_channels, "log_channels"), (feed_validators, "feed_validators"),
+                            (feed_schedules, "feed_schedules")):
+            target.clear()
+            target.update(config_data.get(key, {}))
+        seen_entries.clear()
+        for url, values in config_data.get("seen_entries", {}).items():
+            seen_entries[url] = SeenEntries.from_list(SEEN_ENTRIES_LIMIT, values)
+        logger.info(f"Configuration chargée: {len(rss_configs)} serveurs, {len(log_channels)} canaux de logs")
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement de la configuration: {e}")
 
 # Charger la configuration au démarrage
 load_config()
\ No newline at end of file